@@ -0,0 +1,128 @@
+import time
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+import metrics
+
+# /chat admission control: එකවර run වෙන agent runs ගණන සීමා කරනවා (bounded wait queue එකක් එක්ක),
+# user කෙනෙකුට token bucket එකක්, සහ හැම request එකකටම deadline එකක් (agent loop / tools වලට යනවා).
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: float, reason: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets: `rate_per_minute` refill, up to `burst` tokens (rate 0 = unlimited)."""
+
+    def __init__(self, rate_per_minute: float, burst: int, max_keys: int = 10000):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+
+    def take(self, key):
+        # 0 -> allowed, නැත්නම් ඊළඟ token එකට තව තත්පර කීයද
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        # Users ගොඩක් ආවොත් memory එක සීමා කරන්න පරණම buckets අයින් කරනවා
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def refund(self, key):
+        # Request එක admit නොවුණොත් (503) ගත්ත token එක ආපහු: busy server එකක් 429 වලට තල්ලු නොකරන්න
+        if self.rate <= 0 or key not in self._buckets:
+            return
+        tokens, updated_at = self._buckets[key]
+        self._buckets[key] = (min(self.burst, tokens + 1), updated_at)
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded FIFO wait queue, per-user rate limits and request deadlines."""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float, deadline: float,
+                 rate_per_minute: float, burst: int):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.deadline = deadline
+        self.limiter = TokenBucketLimiter(rate_per_minute, burst)
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def _reject(self, status_code: int, detail: str, retry_after: float, reason: str):
+        metrics.ADMISSION_REJECTIONS.labels(reason).inc()
+        return AdmissionRejected(status_code, detail, retry_after, reason)
+
+    async def acquire(self, user_id):
+        """Admit one agent run and return its deadline (time.monotonic() based)."""
+        deadline = time.monotonic() + self.deadline
+        # Queue එක full නම් rate limit token එක ගන්න කලින්ම reject (retry කරන users 429 වලට යන්නේ නැහැ)
+        if self.active + self.waiting >= self.max_concurrent + self.max_queue:
+            # Queue එකත් පිරිලා: බලාගෙන ඉන්නවාට වඩා ඉක්මනින් reject කරන එක හොඳයි
+            raise self._reject(503, "Server is busy, try again shortly", 1, "queue_full")
+        wait = self.limiter.take(user_id)
+        if wait:
+            raise self._reject(429, "Too many requests, slow down", wait, "rate_limited")
+        self.waiting += 1
+        metrics.AGENT_QUEUED.inc()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=min(self.queue_timeout, self.deadline))
+        except asyncio.TimeoutError:
+            self.limiter.refund(user_id)
+            raise self._reject(503, "Server is busy, try again shortly", 1, "queue_timeout")
+        finally:
+            self.waiting -= 1
+            metrics.AGENT_QUEUED.dec()
+        self.active += 1
+        metrics.AGENT_ACTIVE.inc()
+        return deadline
+
+    def release(self):
+        self.active -= 1
+        metrics.AGENT_ACTIVE.dec()
+        self._semaphore.release()
+
+    def releaser(self):
+        """Release callable that only releases once, for slots freed from several cleanup paths."""
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.release()
+        return release
+
+    @asynccontextmanager
+    async def slot(self, user_id):
+        deadline = await self.acquire(user_id)
+        try:
+            yield deadline
+        finally:
+            self.release()
+
+    def stats(self):
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+        }
@@ -1,59 +1,183 @@
 import os
-import requests
-import googlemaps
+import json
+import logging
+import time
+import asyncio
+import httpx
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # 1. Environment Variables
 load_dotenv()
 
-from typing import Annotated, TypedDict, List
-from langchain_groq import ChatGroq
-from langchain_community.tools.tavily_search import TavilySearchResults
+from typing import Annotated, TypedDict, List, Optional
 from langgraph.graph import StateGraph, END
-from langchain_core.messages import BaseMessage, SystemMessage # SystemMessage එකතු කළා
-from langgraph.prebuilt import ToolNode
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph.message import add_messages
 from langchain_core.tools import tool
+from cache import TTLCache, normalize_key
+from singleflight import SingleFlight, args_key
+from context_policy import compact, count_tokens
+from gazetteer import Gazetteer, load_gazetteer
+import metrics
+
+logger = logging.getLogger("tourism_api.agent")
+
+# --- SHARED HTTP CLIENT ---
+# හැම tool call එකකටම අලුත් connection එකක් නොහදා keep-alive pool එකක් පාවිච්චි කරනවා
+HTTP_TIMEOUT = httpx.Timeout(float(os.getenv("HTTP_TIMEOUT_SECONDS", "5")), connect=2.0)
+HTTP_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+)
+_http_client = None
+
+def get_http_client():
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    return _http_client
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+# --- WEATHER CACHE ---
+OPENWEATHER_URL = os.getenv("OPENWEATHER_BASE_URL", "http://api.openweathermap.org/data/2.5/weather")
+weather_cache = TTLCache(
+    maxsize=int(os.getenv("WEATHER_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("WEATHER_CACHE_TTL", "600")),
+)
+
+# --- GOOGLE MAPS CLIENT & PLACES CACHE ---
+# Place data වෙනස් වෙන්නේ කලාතුරකින් නිසා දිග TTL එකක්
+places_cache = TTLCache(
+    maxsize=int(os.getenv("PLACES_CACHE_SIZE", "2000")),
+    ttl=float(os.getenv("PLACES_CACHE_TTL", str(7 * 24 * 3600))),
+)
+PLACES_CACHE_FILE = os.getenv("PLACES_CACHE_FILE")  # e.g. ./places_cache.json (optional)
+_gmaps_client = None
+
+def load_places_cache():
+    if PLACES_CACHE_FILE:
+        return places_cache.load(PLACES_CACHE_FILE)
+    return 0
+
+def get_gmaps_client():
+    global _gmaps_client
+    if _gmaps_client is None:
+        import googlemaps
+        _gmaps_client = googlemaps.Client(key=os.getenv("GOOGLE_MAPS_API_KEY"), timeout=10)
+    return _gmaps_client
 
 # --- TOOLS (කලින් තිබුණු ඒවාමයි) ---
 @tool
-def get_weather(city: str):
+async def get_weather(city: str):
     """Get current weather for a city."""
+    key = normalize_key(city)
+    cached = weather_cache.get(key)
+    if cached is not None:
+        return cached
+
     api_key = os.getenv("OPENWEATHER_API_KEY")
-    base_url = "http://api.openweathermap.org/data/2.5/weather"
     params = {"q": city, "appid": api_key, "units": "metric"}
     try:
-        response = requests.get(base_url, params=params)
+        response = await get_http_client().get(OPENWEATHER_URL, params=params)
         if response.status_code == 200:
             data = response.json()
             main = data['main']
             weather = data['weather'][0]
-            return f"Current weather in {city}: {weather['description']}, Temp: {main['temp']}°C, Humidity: {main['humidity']}%."
+            result = f"Current weather in {city}: {weather['description']}, Temp: {main['temp']}°C, Humidity: {main['humidity']}%."
+            weather_cache.set(key, result)
+            return result
         return "Weather data unavailable."
-    except:
+    except Exception:
         return "Failed to fetch weather."
 
+@lru_cache(maxsize=None)
+def get_gazetteer():
+    # GAZETTEER_PATH එකේ local places dump එක (නැත්නම් හිස් index එකක්, හැම එකක්ම Google එකට)
+    try:
+        return load_gazetteer()
+    except Exception as e:
+        # File එක කැඩිලා වුණත් startup එක නවතින්නේ නැහැ; find_place Google එකට යනවා
+        logger.error("Gazetteer load failed, continuing without it: %s", e)
+        return Gazetteer([])
+
 @tool
-def find_place(query: str):
-    """Find places using Google Maps."""
-    gmaps_key = os.getenv("GOOGLE_MAPS_API_KEY")
+async def find_place(query: str):
+    """Find places in Sri Lanka by name (e.g. 'Sigiriya') or nearby (e.g. 'hotels near Kandy')."""
+    # Popular places local gazetteer එකෙන් (sub-millisecond), miss වුණොත් විතරක් paid Google call එක
+    local = get_gazetteer().lookup(query)
+    if local is not None:
+        metrics.PLACE_LOOKUPS.labels("gazetteer").inc()
+        return local
+
+    key = normalize_key(query)
+    cached = places_cache.get(key)
+    if cached is not None:
+        metrics.PLACE_LOOKUPS.labels("cache").inc()
+        return cached
+
+    metrics.PLACE_LOOKUPS.labels("google").inc()
     try:
-        gmaps = googlemaps.Client(key=gmaps_key)
-        places_result = gmaps.places(query=query)
+        # googlemaps SDK is sync, so run it in a thread to keep the event loop free
+        places_result = await asyncio.to_thread(get_gmaps_client().places, query=query)
         if places_result['status'] == 'OK' and places_result['results']:
             place = places_result['results'][0]
-            return f"Found: {place.get('name')}, Address: {place.get('formatted_address')}, Rating: {place.get('rating', 'N/A')}"
+            result = f"Found: {place.get('name')}, Address: {place.get('formatted_address')}, Rating: {place.get('rating', 'N/A')}"
+            places_cache.set(key, result)
+            if PLACES_CACHE_FILE:
+                await asyncio.to_thread(places_cache.dump, PLACES_CACHE_FILE)
+            return result
         return "Location not found."
     except Exception as e:
         return f"Maps Error: {str(e)}"
 
-# Tavily Tool
-search_tool = TavilySearchResults(max_results=2)
-tools = [search_tool, get_weather, find_place]
+@tool
+async def search_travel_guides(query: str):
+    """Search the local Sri Lanka travel guides: attractions, history, culture, itineraries and travel tips."""
+    # ./chroma_db guide corpus එක (ingest_data.py); embedding + search CPU වැඩ නිසා thread එකක
+    from rag import get_guide_search
+    results = await asyncio.to_thread(get_guide_search().search, query)
+    if not results:
+        return "No relevant guide content found."
+    return "\n\n".join(
+        f"[{os.path.basename(str(doc.metadata.get('source', 'guide')))} p.{doc.metadata.get('page', '?')}] "
+        f"{doc.page_content}"
+        for doc, _ in results
+    )
+
+# --- LAZY SETUP ---
+# Groq / Tavily clients import වෙද්දී නෙවෙයි, මුලින්ම ඕන වෙද්දී (හෝ warmup එකේදී) හදනවා
+@lru_cache(maxsize=None)
+def get_tools():
+    # Tavily Tool
+    from langchain_community.tools.tavily_search import TavilySearchResults
+    search_tool = TavilySearchResults(max_results=2)
+    return [search_travel_guides, search_tool, get_weather, find_place]
+
+@lru_cache(maxsize=None)
+def get_tools_by_name():
+    return {t.name: t for t in get_tools()}
 
 # --- LLM SETUP ---
-llm = ChatGroq(model="llama-3.3-70b-versatile", api_key=os.getenv("GROQ_API_KEY"))
-llm_with_tools = llm.bind_tools(tools)
+@lru_cache(maxsize=None)
+def get_llm():
+    from langchain_groq import ChatGroq
+    return ChatGroq(model="llama-3.3-70b-versatile", api_key=os.getenv("GROQ_API_KEY"))
+
+@lru_cache(maxsize=None)
+def get_llm_with_tools():
+    return get_llm().bind_tools(get_tools())
+
+@lru_cache(maxsize=None)
+def get_llm_final_answer():
+    # Loop limit එකට ආවම tools නැතුව අන්තිම උත්තරයක් දෙන්න බල කරනවා
+    return get_llm().bind_tools(get_tools(), tool_choice="none")
 
 # --- SYSTEM PROMPT (මේක තමයි අලුත් මොළය) ---
 # මෙතැනින් අපි AI එකට උපදෙස් දෙනවා කොහොමද වැඩ කරන්න ඕනේ කියලා
@@ -63,36 +187,166 @@ Your goal is to help tourists plan their trips.
 Guidelines:
 1. **Use Context:** If you already checked the weather in a previous turn, USE that information to answer follow-up questions (like "Can I visit today?").
 2. **Be Decisive:** If the weather is bad (rain/storm), advise the user to be careful or suggest indoor activities. If it's good, say it's a great time to visit.
-3. **Use Tools:** If you don't know the current situation (e.g., protests, floods), use the 'tavily_search_results_json' tool to check for "news in [city]".
-4. **Friendly:** Be polite and welcoming.
+3. **Guides First:** For attractions, history, culture, itineraries and travel tips (e.g., "what to see in Anuradhapura"), use the 'search_travel_guides' tool first. Only search the web if the guides have nothing relevant.
+4. **Use Tools:** If you don't know the current situation (e.g., protests, floods), use the 'tavily_search_results_json' tool to check for "news in [city]".
+5. **Friendly:** Be polite and welcoming.
 
 Current Task: Help the user with their travel query based on the above tools and history."""
 
+# Agent <-> tools loop එක උපරිම වාර ගණන (හැම turn එකකටම)
+MAX_AGENT_ITERATIONS = int(os.getenv("MAX_AGENT_ITERATIONS", "5"))
+
 class AgentState(TypedDict):
     messages: Annotated[List[BaseMessage], add_messages]
+    iterations: int  # මේ turn එකේ call_model කී පාරක් run වුණාද
+    summary: Optional[str]  # පරණ turns වල rolling summary එක (context_policy)
+    summarized: int  # summary එකට එකතු කරපු messages ගණන (මුල ඉඳන්)
+
+# --- REQUEST DEADLINE ---
+# main.py එකෙන් config["configurable"]["deadline"] (time.monotonic()) එකක් එනවා; ඉවර වුණාම
+# අලුත් LLM / tool calls පටන් ගන්නේ නැහැ. ටිකක් විතරක් ඉතුරු නම් tools නැතුව උත්තරයක් දෙනවා.
+FINAL_ANSWER_MARGIN = float(os.getenv("DEADLINE_FINAL_ANSWER_MARGIN", "8"))
+
+class DeadlineExceeded(Exception):
+    pass
+
+def time_left(config: RunnableConfig):
+    deadline = (config or {}).get("configurable", {}).get("deadline")
+    return None if deadline is None else deadline - time.monotonic()
 
 # --- NODE: CALL MODEL (වෙනස් කළ කොටස) ---
-def call_model(state: AgentState):
-    # System Message එක මුලට එකතු කරනවා
-    messages = [SystemMessage(content=SYSTEM_INSTRUCTION)] + state['messages']
+async def call_model(state: AgentState, config: RunnableConfig):
+    remaining = time_left(config)
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded("Request deadline exceeded before the model call")
+    # System Message එක + summary එක + token budget එකට ගැලපෙන messages ටික විතරයි
+    summary, summarized = state.get("summary"), state.get("summarized", 0)
+    # Summary call එකත් deadline එක ඇතුලේ; අන්තිම උත්තරයට FINAL_ANSWER_MARGIN එක ඉතුරු කරනවා
+    summary_timeout = None if remaining is None else remaining - FINAL_ANSWER_MARGIN
+    with metrics.span("context_compaction"):
+        messages, new_summary, new_summarized = await compact(
+            SYSTEM_INSTRUCTION, state['messages'], summary, summarized, get_llm(), timeout=summary_timeout
+        )
+    metrics.PROMPT_TOKENS.observe(count_tokens(messages))
+    iterations = state.get("iterations", 0) + 1
+    out_of_time = remaining is not None and remaining < FINAL_ANSWER_MARGIN
+    model = get_llm_with_tools() if iterations < MAX_AGENT_ITERATIONS and not out_of_time else get_llm_final_answer()
     
-    response = llm_with_tools.invoke(messages)
-    return {"messages": [response]}
+    with metrics.observe_node("agent"):
+        try:
+            response = await asyncio.wait_for(model.ainvoke(messages), timeout=time_left(config))
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Request deadline exceeded during the model call")
+    metrics.record_llm_usage(response)
+    update = {"messages": [response], "iterations": iterations}
+    if new_summarized != summarized:
+        update.update(summary=new_summary, summarized=new_summarized)
+    return update
 
-tool_node = ToolNode(tools)
+# --- NODE: TOOLS (parallel, per-tool timeout) ---
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT_SECONDS", "8"))
+TOOL_TIMEOUTS = {
+    "get_weather": float(os.getenv("WEATHER_TOOL_TIMEOUT", "5")),
+    "find_place": float(os.getenv("PLACES_TOOL_TIMEOUT", "5")),
+    "tavily_search_results_json": float(os.getenv("SEARCH_TOOL_TIMEOUT", "10")),
+    "search_travel_guides": float(os.getenv("GUIDES_TOOL_TIMEOUT", "5")),
+}
+
+# එකම වෙලාවේ users ලා කිහිප දෙනෙක් "weather in Colombo" ඇහුවොත් upstream call එක එකයි
+TOOL_SINGLEFLIGHT = os.getenv("TOOL_SINGLEFLIGHT", "1") == "1"
+tool_flight = SingleFlight()
+
+async def invoke_tool(selected_tool, args: dict, config: RunnableConfig):
+    if not TOOL_SINGLEFLIGHT:
+        return await selected_tool.ainvoke(args, config=config)
+    # Shared call එක පටන් ගත්ත run එකේ config (callbacks) එකෙන් run වෙනවා
+    content, shared = await tool_flight.do(
+        (selected_tool.name, args_key(args)), lambda: selected_tool.ainvoke(args, config=config)
+    )
+    if shared:
+        metrics.TOOL_COALESCED.labels(selected_tool.name).inc()
+    return content
+
+async def run_tool(tool_call: dict, config: RunnableConfig):
+    name = tool_call["name"]
+    selected_tool = get_tools_by_name().get(name)
+    outcome = "ok"
+    start = time.perf_counter()
+    if selected_tool is None:
+        outcome = "error"
+        content = f"Error: unknown tool '{name}'."
+    else:
+        timeout = TOOL_TIMEOUTS.get(name, TOOL_TIMEOUT)
+        remaining = time_left(config)
+        if remaining is not None:
+            # Request එකේ deadline එකට වඩා tool එක run වෙන්න දෙන්නේ නැහැ
+            timeout = max(min(timeout, remaining), 0)
+        try:
+            content = await asyncio.wait_for(
+                invoke_tool(selected_tool, tool_call["args"], config),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            content = f"The {name} tool did not respond in time. Answer without this information."
+        except Exception as e:
+            outcome = "error"
+            content = f"The {name} tool failed: {e}. Answer without this information."
+    # Tool එකින් එකට latency (කුමන upstream එකද slow කියලා /metrics එකෙන් බලන්න)
+    metrics.record_tool(name, time.perf_counter() - start, outcome)
+
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False, default=str)
+    return ToolMessage(content=content, name=name, tool_call_id=tool_call["id"])
+
+async def call_tools(state: AgentState, config: RunnableConfig):
+    # එක turn එකේ tool calls කිහිපයක් ආවොත් ඔක්කොම එකවර run කරනවා
+    tool_calls = state['messages'][-1].tool_calls
+    with metrics.observe_node("tools"):
+        results = await asyncio.gather(*(run_tool(call, config) for call in tool_calls))
+    return {"messages": list(results)}
 
 def should_continue(state: AgentState):
     last_message = state['messages'][-1]
-    if last_message.tool_calls:
+    if last_message.tool_calls and state.get("iterations", 0) < MAX_AGENT_ITERATIONS:
         return "tools"
+    metrics.AGENT_ITERATIONS.observe(state.get("iterations", 0))
     return END
 
 # --- GRAPH ---
 workflow = StateGraph(AgentState)
 workflow.add_node("agent", call_model)
-workflow.add_node("tools", tool_node)
+workflow.add_node("tools", call_tools)
 workflow.set_entry_point("agent")
 workflow.add_conditional_edges("agent", should_continue)
 workflow.add_edge("tools", "agent")
 
-tourism_agent = workflow.compile()
\ No newline at end of file
+async def close_pending_tool_calls(graph, config: RunnableConfig):
+    """Answer tool_calls left open by a cancelled run so the thread's next turn stays valid."""
+    # Agent node එක AIMessage(tool_calls) එක checkpoint කරලා tools node එක අතරමග cancel වුණොත්
+    # ToolMessages නැති නිසා ඊළඟ LLM call එක reject වෙනවා; ඒ නිසා "cancelled" උත්තර දානවා
+    snapshot = await graph.aget_state(config)
+    messages = (snapshot.values or {}).get("messages", [])
+    if not messages or not isinstance(messages[-1], AIMessage) or not messages[-1].tool_calls:
+        return
+    cancelled = [
+        ToolMessage(content="The request was cancelled before this tool finished.",
+                    name=call["name"], tool_call_id=call["id"])
+        for call in messages[-1].tool_calls
+    ]
+    await graph.aupdate_state(config, {"messages": cancelled}, as_node="tools")
+
+def build_agent(checkpointer=None):
+    # Checkpointer එකක් දුන්නොත් thread_id එකෙන් conversation state එක server එකේ තියාගන්නවා
+    return workflow.compile(checkpointer=checkpointer)
+
+def warmup():
+    # Worker එක traffic ගන්න කලින් clients හදලා තියනවා (sync calls, thread එකක run කරන්න)
+    get_tools_by_name()
+    get_llm_with_tools()
+    get_llm_final_answer()
+    get_gmaps_client()
+    get_gazetteer()
+    # Embedding model එක සහ vector store එක process එකට එක පාරක් load කරනවා
+    from rag import get_guide_search
+    get_guide_search().embeddings.embed_query("Sri Lanka")
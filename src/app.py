@@ -1,10 +1,8 @@
 import streamlit as st
 import os
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain.chains import RetrievalQA
+from rag import build_qa_chain
+from ingest_data import CHROMA_DIR
 
 # 1. Page Config (Tab එකේ නම)
 st.set_page_config(page_title="Smart Tourism Agent", page_icon="🇱🇰")
@@ -19,37 +17,20 @@ load_dotenv()
 # 4. Cache Resource (හැම සැරේම මොඩල් එක ලෝඩ් නොවී වේගවත් කරන්න)
 @st.cache_resource
 def load_agent():
-    # Embeddings
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    
     # Database Connect
-    if not os.path.exists("./chroma_db"):
+    if not os.path.exists(CHROMA_DIR):
         st.error("Database not found! Please run ingest_data.py first.")
         return None
-        
-    vector_db = Chroma(
-        persist_directory="./chroma_db",
-        embedding_function=embeddings
-    )
-    
-    # LLM Setup (Groq)
-    llm = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0.5,
-        api_key=os.getenv("GROQ_API_KEY")
-    )
-    
-    # RAG Chain
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=vector_db.as_retriever(search_kwargs={"k": 3}),
-        return_source_documents=True
-    )
-    return qa_chain
+
+    # Embeddings, Chroma, Groq සහ semantic cache එක rag.py එකෙන්
+    return build_qa_chain()
 
 qa_chain = load_agent()
 
+if qa_chain:
+    cache_stats = qa_chain.cache.stats()
+    st.sidebar.caption(f"⚡ Answer cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+
 # 5. Chat Interface (Chat History පෙන්වන්න)
 if "messages" not in st.session_state:
     st.session_state.messages = []
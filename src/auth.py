@@ -1,16 +1,37 @@
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from typing import Optional
 
 # Password Hash කිරීමට අවශ්‍ය සැකසුම්
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# BCRYPT_ROUNDS වෙනස් කළොත් පරණ hashes login එකේදී අලුත් cost එකට rehash වෙනවා
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
 # JWT සඳහා රහස්‍ය Key එකක් (ඔයාට කැමති එකක් දෙන්න)
 SECRET_KEY = "Isuru20000628"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# bcrypt CPU-heavy නිසා API එකේ threadpool එකේ නෙවෙයි, වෙනම process pool එකක run කරනවා
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "64"))  # මීට වැඩිය queue වුණොත් reject
+_hash_pool = None
+_pending_hashes = 0
+
+class PasswordHasherBusy(Exception):
+    pass
+
 # Password එක Hash කරන Function එක
 def hash_password(password: str):
     return pwd_context.hash(password)
@@ -19,9 +40,48 @@ def hash_password(password: str):
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+# Verify කරලා cost එක වෙනස් නම් අලුත් hash එකකුත් දෙනවා: (valid, new_hash or None)
+def verify_and_update(plain_password, hashed_password):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def start_hash_pool():
+    # Lifespan startup එකේ හදනවා. Threads (aiosqlite, anyio, embedding batcher) තියෙන process එකක්
+    # fork කළොත් child එක deadlock වෙන්න පුළුවන් නිසා workers forkserver (නැත්නම් spawn) එකෙන්
+    global _hash_pool
+    if _hash_pool is None:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _hash_pool = ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context(method))
+    return _hash_pool
+
+def get_hash_pool():
+    return start_hash_pool()
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+async def _run_in_hash_pool(fn, *args):
+    global _pending_hashes
+    if _pending_hashes >= HASH_MAX_PENDING:
+        raise PasswordHasherBusy()
+    _pending_hashes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hash_pool(), fn, *args)
+    finally:
+        _pending_hashes -= 1
+
+async def hash_password_async(password: str):
+    return await _run_in_hash_pool(hash_password, password)
+
+async def verify_and_update_async(plain_password, hashed_password):
+    return await _run_in_hash_pool(verify_and_update, plain_password, hashed_password)
+
 # JWT Token එකක් සාදන Function එක
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
\ No newline at end of file
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
@@ -0,0 +1,83 @@
+import json
+import requests
+from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Streamlit frontend එක backend එකට කතා කරන්නේ මේ client එකෙන්:
+# keep-alive connection pool එකක්, timeouts, සහ ETag එකෙන් history cache කිරීම.
+
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 30
+STREAM_READ_TIMEOUT = 120
+
+
+class BackendClient:
+    def __init__(self, base_url: str, pool_size: int = 10):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        # GET requests විතරක් retry කරනවා (POST /chat දෙපාරක් යවන්න හොඳ නැහැ)
+        retry = Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _url(self, path: str):
+        return f"{self.base_url}{path}"
+
+    def signup(self, username: str, email: str, password: str):
+        return self.session.post(self._url("/signup"), params={"username": username, "email": email, "password": password},
+                                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+
+    def login(self, email: str, password: str):
+        return self.session.post(self._url("/login"), params={"email": email, "password": password},
+                                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+
+    def chat_stream(self, payload: dict):
+        # SSE events (event, data) විදිහට yield කරනවා
+        with self.session.post(self._url("/chat/stream"), json=payload, stream=True,
+                               timeout=(CONNECT_TIMEOUT, STREAM_READ_TIMEOUT)) as res:
+            res.raise_for_status()
+            event = None
+            for line in res.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    yield event, json.loads(line[len("data:"):])
+
+    def history_page(self, user_id: int, cursor=None, limit: int = 20, cache=None):
+        # cache: {(path, cursor, limit): {"etag": ..., "page": ...}} (Streamlit session_state එකේ තියාගන්න)
+        return self._cached_page(f"/history/{user_id}", cursor, limit, cache)
+
+    def thread_page(self, user_id: int, cursor=None, limit: int = 20, cache=None):
+        # Sidebar එකට conversation (thread) එකකට එක item එකක්
+        return self._cached_page(f"/history/{user_id}/threads", cursor, limit, cache)
+
+    def _cached_page(self, path: str, cursor, limit: int, cache):
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        key = (path, cursor, limit)
+        cached = cache.get(key) if cache is not None else None
+        headers = {"If-None-Match": cached["etag"]} if cached else {}
+
+        res = self.session.get(self._url(path), params=params, headers=headers,
+                               timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        if res.status_code == 304 and cached:
+            return cached["page"]  # වෙනසක් නැහැ: payload එකක් නැතුව cache එකෙන්
+        res.raise_for_status()
+        page = res.json()
+        if cache is not None and res.headers.get("ETag"):
+            cache[key] = {"etag": res.headers["ETag"], "page": page}
+        return page
+
+    def thread(self, user_id: int, thread_id: str):
+        res = self.session.get(self._url(f"/history/{user_id}/threads/{quote(thread_id, safe='')}"),
+                               timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        res.raise_for_status()
+        return res.json()
+
+    def conversation(self, user_id: int, chat_id: int):
+        res = self.session.get(self._url(f"/history/{user_id}/{chat_id}"), timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        res.raise_for_status()
+        return res.json()
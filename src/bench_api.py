@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+import uuid
+import random
+import asyncio
+import argparse
+
+# Offline load test: main.py app එක in-process run කරලා (fake LLM/tools, SQLite)
+# virtual users ලා /signup, /login, /chat, /history call කරනවා.
+#   python bench_api.py --users 20 --duration 30 --llm-latency 0.3 --tool-latency 0.1
+
+QUERIES = [
+    "What's the weather like in Kandy today?",
+    "Is it safe to travel to Galle? Any news?",
+    "Find me a hotel in Ella",
+    "Weather in Sigiriya and where can I stay?",
+    "Suggest a two day plan for Nuwara Eliya",
+    "Any news about floods in Trincomalee?",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline load test for the Smart Tourism API")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load per run")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="fake Groq latency per call (s)")
+    parser.add_argument("--tool-latency", type=float, default=0.1, help="fake Tavily/weather/Maps latency (s)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="pause between a user's requests (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def configure_environment(workdir: str):
+    # main import කරන්න කලින්: SQLite DB, checkpoints, spill file bench directory එකේ
+    os.makedirs(workdir, exist_ok=True)
+    for name in ("bench.db", "bench_checkpoints.db", "chatlog_spill.jsonl"):
+        path = os.path.join(workdir, name)
+        if os.path.exists(path):
+            os.remove(path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["CHECKPOINT_DB_URL"] = f"sqlite:///{os.path.join(workdir, 'bench_checkpoints.db')}"
+    os.environ["CHATLOG_SPILL_PATH"] = os.path.join(workdir, "chatlog_spill.jsonl")
+    os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+    os.environ.setdefault("BCRYPT_ROUNDS", "10")
+    # Virtual users think-time නැතුව යවන නිසා per-user rate limit එක load test එකේදී off
+    os.environ.setdefault("USER_CHAT_RATE_PER_MINUTE", "0")
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, endpoint: str, elapsed_ms: float, ok: bool):
+        self.latencies.setdefault(endpoint, []).append(elapsed_ms)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    async def timed(self, endpoint: str, request):
+        start = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code < 400
+        except Exception:
+            response, ok = None, False
+        self.record(endpoint, (time.perf_counter() - start) * 1000, ok)
+        return response
+
+
+async def virtual_user(client, recorder, rng, stop_at, think_time):
+    email = f"vu-{uuid.uuid4().hex[:10]}@example.com"
+    password = "bench-password"
+    res = await recorder.timed("/signup", client.post(
+        "/signup", params={"username": email.split("@")[0], "email": email, "password": password}))
+    if res is None or res.status_code != 200:
+        return
+    user_id = res.json()["user_id"]
+    await recorder.timed("/login", client.post("/login", params={"email": email, "password": password}))
+
+    thread_id = None
+    while time.perf_counter() < stop_at:
+        payload = {"user_query": rng.choice(QUERIES), "user_id": user_id, "thread_id": thread_id}
+        res = await recorder.timed("/chat", client.post("/chat", json=payload))
+        if res is not None and res.status_code == 200:
+            thread_id = res.json()["thread_id"]
+        await recorder.timed("/history", client.get(f"/history/{user_id}", params={"limit": 20}))
+        if think_time:
+            await asyncio.sleep(think_time)
+
+
+async def run(args):
+    import httpx
+    import main
+    from bench_fakes import install_agent_fakes, percentiles
+
+    install_agent_fakes(llm_latency=args.llm_latency, tool_latency=args.tool_latency)
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+
+    async with main.lifespan(main.app):
+        while not main.app.state.ready:
+            await asyncio.sleep(0.05)
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            start = time.perf_counter()
+            stop_at = start + args.duration
+            await asyncio.gather(*(
+                virtual_user(client, recorder, random.Random(rng.random()), stop_at, args.think_time)
+                for _ in range(args.users)
+            ))
+            elapsed = time.perf_counter() - start
+
+    total = sum(len(v) for v in recorder.latencies.values())
+    print(f"\n{args.users} users, {elapsed:.1f}s, llm {args.llm_latency}s, tools {args.tool_latency}s")
+    print(f"{'endpoint':<10} {'count':>6} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint in ("/signup", "/login", "/chat", "/history"):
+        values = recorder.latencies.get(endpoint, [])
+        p = percentiles(values)
+        print(f"{endpoint:<10} {len(values):>6} {recorder.errors.get(endpoint, 0):>6} {len(values) / elapsed:>8.1f} "
+              f"{p['p50']:>9.1f} {p['p95']:>9.1f} {p['p99']:>9.1f}")
+    print(f"{'total':<10} {total:>6} {sum(recorder.errors.values()):>6} {total / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    configure_environment(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bench"))
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    asyncio.run(run(args))
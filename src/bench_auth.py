@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import uuid
+import asyncio
+import httpx
+
+# Login burst එකක් අතරතුර /history latency එකට වෙන බලපෑම මනින්න (running backend එකකට එරෙහිව)
+#   uvicorn main:app  ->  python bench_auth.py [logins] [concurrency]
+
+BASE_URL = os.getenv("BENCH_BASE_URL", "http://127.0.0.1:8000")
+LOGINS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+async def sample_history(client, user_id, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(f"/history/{user_id}", params={"limit": 20})
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def history_baseline(client, user_id, seconds=3.0):
+    latencies, stop = [], asyncio.Event()
+    task = asyncio.create_task(sample_history(client, user_id, stop, latencies))
+    await asyncio.sleep(seconds)
+    stop.set()
+    await task
+    return latencies
+
+
+async def main():
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    password = "bench-password"
+    limits = httpx.Limits(max_connections=CONCURRENCY + 4)
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=60, limits=limits) as client:
+        res = await client.post("/signup", params={"username": email.split("@")[0], "email": email, "password": password})
+        res.raise_for_status()
+        user_id = res.json()["user_id"]
+
+        baseline = await history_baseline(client, user_id)
+
+        statuses = {}
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def login_once():
+            async with semaphore:
+                res = await client.post("/login", params={"email": email, "password": password})
+                statuses[res.status_code] = statuses.get(res.status_code, 0) + 1
+
+        under_load, stop = [], asyncio.Event()
+        sampler = asyncio.create_task(sample_history(client, user_id, stop, under_load))
+        start = time.perf_counter()
+        await asyncio.gather(*(login_once() for _ in range(LOGINS)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await sampler
+
+    print(f"logins: {LOGINS} in {elapsed:.2f}s -> {statuses.get(200, 0) / elapsed:.1f} logins/sec (statuses: {statuses})")
+    print(f"/history idle:       p50 {percentile(baseline, 0.5):7.1f} ms  p99 {percentile(baseline, 0.99):7.1f} ms")
+    print(f"/history under load: p50 {percentile(under_load, 0.5):7.1f} ms  p99 {percentile(under_load, 0.99):7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
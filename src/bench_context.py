@@ -0,0 +1,148 @@
+import os
+import sys
+import asyncio
+import argparse
+from collections import defaultdict
+
+# Context compaction report: එකම දිග conversations context_policy එක සමග සහ නැතුව replay කරලා
+# LLM එකට යවන prompt tokens සංසන්දනය කරනවා (fake Groq / tools, network නැහැ).
+#   python bench_context.py
+#   python bench_context.py --database-url sqlite:///./tourism.db   -> chat_logs table එකේ ඇත්ත threads
+
+TRIPS = {
+    "hill-country": [
+        "What's the weather like in Kandy today?",
+        "Any news about protests in Kandy? Is it safe?",
+        "Find me a hotel in Kandy",
+        "How is the weather in Nuwara Eliya?",
+        "Is it safe to take the train to Nuwara Eliya? Any news?",
+        "Find a guesthouse in Nuwara Eliya",
+        "Weather in Ella tomorrow?",
+        "Where can I stay in Ella near the Nine Arch bridge?",
+        "Any news about landslides near Ella?",
+        "What should I pack for the hill country?",
+        "Can I hike Little Adam's Peak if it rains?",
+        "Summarize my hill country plan",
+    ],
+    "south-coast": [
+        "Weather in Galle this week?",
+        "Find a hotel in Galle fort",
+        "Any news about the sea conditions in Galle? Is it safe to swim?",
+        "Weather in Mirissa for whale watching",
+        "Find a whale watching tour in Mirissa",
+        "Any news about beach closures in Mirissa?",
+        "Weather in Colombo when I fly out",
+        "Find a hotel near Colombo airport",
+        "Is the expressway from Galle to Colombo safe? Any news?",
+        "What did you say about Galle earlier?",
+    ],
+    "cultural-triangle": [
+        "Weather in Sigiriya in the morning?",
+        "Find me a hotel near Sigiriya",
+        "Any news about crowds at Sigiriya? Is it safe to climb?",
+        "Weather in Trincomalee for the weekend",
+        "Find a beach hotel in Trincomalee",
+        "Any news about floods in Trincomalee?",
+        "Weather in Jaffna next",
+        "Where can I find a guesthouse in Jaffna?",
+        "Is it safe to drive from Trincomalee to Jaffna? Any news?",
+        "Remind me which hotels you found",
+        "Weather in Colombo on my last day",
+        "Find a hotel in Colombo",
+    ],
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Prompt token usage with and without context compaction")
+    parser.add_argument("--database-url", help="replay recorded chat_logs threads instead of the built-in trips")
+    parser.add_argument("--min-turns", type=int, default=8, help="shortest recorded thread to replay")
+    parser.add_argument("--search-chars", type=int, default=1500, help="size of fake Tavily results")
+    return parser.parse_args()
+
+
+def load_recorded(database_url: str, min_turns: int):
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_url)
+    threads = defaultdict(list)
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT user_id, thread_id, query FROM chat_logs WHERE thread_id IS NOT NULL ORDER BY timestamp, id"
+        ))
+        for user_id, thread_id, query in rows:
+            threads[f"{user_id}:{thread_id}"].append(query)
+    return {name: queries for name, queries in threads.items() if len(queries) >= min_turns}
+
+
+async def replay(graph, thread: str, queries):
+    from langchain_core.callbacks import AsyncCallbackHandler
+    from langchain_core.messages import HumanMessage
+    import context_policy
+    from context_policy import count_tokens, summary_prompt
+
+    usage = {"agent": [], "summary": []}
+
+    class PromptCounter(AsyncCallbackHandler):
+        async def on_chat_model_start(self, serialized, messages, **kwargs):
+            for prompt in messages:
+                usage["agent"].append(count_tokens(prompt))
+
+    # Summary call එක graph callbacks වලින් detach කරලා නිසා ඒක වෙනම මනිනවා
+    summarize = context_policy.summarize
+
+    async def counted_summarize(llm, summary, messages):
+        usage["summary"].append(count_tokens(summary_prompt(summary, messages)))
+        return await summarize(llm, summary, messages)
+
+    context_policy.summarize = counted_summarize
+    config = {"configurable": {"thread_id": thread}, "callbacks": [PromptCounter()]}
+    try:
+        for query in queries:
+            await graph.ainvoke({"messages": [HumanMessage(content=query)], "iterations": 0}, config=config)
+    finally:
+        context_policy.summarize = summarize
+    return usage
+
+
+async def run(args):
+    from langgraph.checkpoint.memory import MemorySaver
+    from bench_fakes import install_agent_fakes
+    import agent
+    import context_policy
+
+    install_agent_fakes(llm_latency=0, tool_latency=0, search_result_chars=args.search_chars)
+    conversations = load_recorded(args.database_url, args.min_turns) if args.database_url else TRIPS
+    if not conversations:
+        print("No recorded threads long enough to replay.")
+        return
+
+    policies = {"full history": dict(CONTEXT_MAX_TOKENS=10**9, STALE_TOOL_RESULT_CHARS=10**9), "compacted": {}}
+    defaults = {name: getattr(context_policy, name) for name in ("CONTEXT_MAX_TOKENS", "STALE_TOOL_RESULT_CHARS")}
+    print(f"budget {context_policy.CONTEXT_MAX_TOKENS} tokens (target {context_policy.CONTEXT_TARGET_TOKENS}), "
+          f"stale tool results cut to {context_policy.STALE_TOOL_RESULT_CHARS} chars\n")
+    print(f"{'conversation':<22} {'turns':>5} {'policy':<13} {'calls':>5} {'total':>8} {'max':>6} "
+          f"{'last':>6} {'summary':>8}")
+    totals = defaultdict(int)
+    for name, queries in conversations.items():
+        for policy, overrides in policies.items():
+            for key, value in {**defaults, **overrides}.items():
+                setattr(context_policy, key, value)
+            graph = agent.build_agent(checkpointer=MemorySaver())
+            usage = await replay(graph, f"{policy}:{name}", queries)
+            prompts = usage["agent"]
+            overhead = sum(usage["summary"])
+            totals[policy] += sum(prompts) + overhead
+            print(f"{name[:22]:<22} {len(queries):>5} {policy:<13} {len(prompts):>5} {sum(prompts):>8} "
+                  f"{max(prompts):>6} {prompts[-1]:>6} {overhead:>8}")
+    for key, value in defaults.items():
+        setattr(context_policy, key, value)
+
+    before, after = totals["full history"], totals["compacted"]
+    print(f"\ntotal prompt tokens: {before} -> {after} (incl. summaries), "
+          f"{100 * (before - after) / before:.1f}% fewer")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import argparse
+import threading
+
+# Query embedding throughput: එකින් එක (unbatched) vs micro-batched vs cache hits.
+# Default එක network / model download නැතුව simulated model එකක් (call overhead + per-text cost).
+#   python bench_embeddings.py --threads 16 --queries 50
+#   python bench_embeddings.py --model      -> ඇත්ත all-MiniLM-L6-v2 model එක
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Query embedding throughput benchmark")
+    parser.add_argument("--threads", type=int, default=16, help="concurrent callers")
+    parser.add_argument("--queries", type=int, default=50, help="queries per caller")
+    parser.add_argument("--model", action="store_true", help="use the real sentence-transformers model")
+    parser.add_argument("--call-overhead", type=float, default=0.004, help="simulated cost per model call (s)")
+    parser.add_argument("--per-text", type=float, default=0.0005, help="simulated cost per text in a call (s)")
+    return parser.parse_args()
+
+
+def simulated_model(call_overhead: float, per_text: float, dim: int = 384):
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    cpu = threading.Lock()
+
+    class SimulatedModel(DeterministicFakeEmbedding):
+        # Forward pass එකේ fixed cost එක batch එකට එක පාරයි. CPU cores ඔක්කොම එක call එකකට
+        # යන නිසා එකම වෙලාවේ එන calls එකින් එක run වෙනවා (lock එකෙන් simulate කරනවා)
+        def embed_documents(self, texts):
+            with cpu:
+                time.sleep(call_overhead + per_text * len(texts))
+            return super().embed_documents(texts)
+
+        def embed_query(self, text):
+            return self.embed_documents([text])[0]
+
+    return SimulatedModel(size=dim)
+
+
+def run(label, embed_query, threads, queries, unique=True):
+    def caller(worker):
+        for i in range(queries):
+            text = f"things to do in city {worker}-{i}" if unique else f"things to do in city {i % 10}"
+            embed_query(text)
+
+    workers = [threading.Thread(target=caller, args=(w,)) for w in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    total = threads * queries
+    print(f"{label:<28} {total:>7} {elapsed:>9.2f} {total / elapsed:>10.1f}")
+
+
+def main():
+    args = parse_args()
+    from embedding_service import SharedEmbeddings, load_model
+
+    base = load_model() if args.model else simulated_model(args.call_overhead, args.per_text)
+    base.embed_query("warmup")
+
+    print(f"{'mode':<28} {'queries':>7} {'seconds':>9} {'queries/s':>10}")
+    run("unbatched", base.embed_query, args.threads, args.queries)
+    batched = SharedEmbeddings(base)
+    run("micro-batched", batched.embed_query, args.threads, args.queries)
+    print(f"  avg batch size: {batched.batcher.stats()['avg_batch_size']}")
+    cached = SharedEmbeddings(base)
+    run("micro-batched + cache (10 q)", cached.embed_query, args.threads, args.queries, unique=False)
+    print(f"  cache hit rate: {cached.cache.stats()['hit_rate']}")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,214 @@
+import time
+import random
+import asyncio
+import textwrap
+from typing import List, Optional
+
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+
+# Network නැතුව benchmarks run කරන්න Groq, Tavily, OpenWeatherMap සහ Google Maps වල
+# deterministic fake versions. Latency එක configurable (seconds).
+
+CITIES = ["Colombo", "Kandy", "Ella", "Galle", "Sigiriya", "Jaffna", "Trincomalee", "Nuwara Eliya"]
+
+
+class FakeChatModel(BaseChatModel):
+    """ChatGroq stand-in: calls tools based on keywords, then answers from the tool results."""
+
+    latency: float = 0.3
+    tools_enabled: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-groq"
+
+    def bind_tools(self, tools, tool_choice: Optional[str] = None, **kwargs):
+        return self.model_copy(update={"tools_enabled": tool_choice != "none"})
+
+    def _respond(self, messages) -> AIMessage:
+        last = messages[-1]
+        prompt_tokens = sum(len(str(m.content)) // 4 for m in messages)
+        if self.tools_enabled and isinstance(last, HumanMessage):
+            tool_calls = plan_tool_calls(str(last.content))
+            if tool_calls:
+                return AIMessage(content="", tool_calls=tool_calls, usage_metadata={
+                    "input_tokens": prompt_tokens, "output_tokens": 20, "total_tokens": prompt_tokens + 20,
+                })
+
+        tool_results = []
+        for message in reversed(messages):
+            if not isinstance(message, ToolMessage):
+                break
+            tool_results.append(str(message.content)[:200])
+        answer = "Here is what I found for your trip. " + " ".join(reversed(tool_results))
+        answer += " Have a wonderful time in Sri Lanka!"
+        output_tokens = len(answer) // 4
+        return AIMessage(content=answer, usage_metadata={
+            "input_tokens": prompt_tokens, "output_tokens": output_tokens, "total_tokens": prompt_tokens + output_tokens,
+        })
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+
+def find_city(text: str):
+    for city in CITIES:
+        if city.lower() in text.lower():
+            return city
+    return "Colombo"
+
+
+def plan_tool_calls(text: str):
+    city = find_city(text)
+    calls = []
+    lowered = text.lower()
+    if "weather" in lowered or "rain" in lowered:
+        calls.append({"name": "get_weather", "args": {"city": city}, "id": f"call_weather_{len(text)}"})
+    if "news" in lowered or "safe" in lowered:
+        calls.append({"name": "tavily_search_results_json", "args": {"query": f"news in {city}"}, "id": f"call_news_{len(text)}"})
+    if "what to see" in lowered or "plan" in lowered or "things to do" in lowered:
+        calls.append({"name": "search_travel_guides", "args": {"query": f"things to do in {city}"}, "id": f"call_guide_{len(text)}"})
+    if "where" in lowered or "find" in lowered or "hotel" in lowered:
+        calls.append({"name": "find_place", "args": {"query": f"hotels in {city}"}, "id": f"call_place_{len(text)}"})
+    return calls
+
+
+def make_fake_search_tool(latency: float, content_chars: int = 0):
+    @tool("tavily_search_results_json")
+    async def fake_search(query: str):
+        """Search the web for recent news."""
+        await asyncio.sleep(latency)
+        content = f"No travel warnings reported for {query}."
+        if content_chars > len(content):
+            # Tavily snippets වගේ දිග content එකක් (context compaction benchmarks වලට)
+            filler = " ".join(guide_pages(seed=len(query), pages=1, words_per_page=content_chars // 5))
+            content = (content + " " + filler)[:content_chars]
+        return [{"url": "https://example.com/news", "content": content}]
+
+    return fake_search
+
+
+def make_fake_guide_tool(latency: float = 0.005):
+    # Local RAG lookup එකක් (network නැහැ) නිසා web tools වලට වඩා ගොඩක් අඩු latency
+    @tool("search_travel_guides")
+    async def fake_guides(query: str):
+        """Search the local Sri Lanka travel guides."""
+        await asyncio.sleep(latency)
+        return f"[guide.pdf p.1] {guide_pages(seed=len(query), pages=1, words_per_page=120)[0]}"
+
+    return fake_guides
+
+
+def make_weather_transport(latency: float):
+    # OpenWeatherMap response එකේ shape එකම (agent.get_weather parse කරන fields)
+    async def handler(request: httpx.Request):
+        await asyncio.sleep(latency)
+        city = request.url.params.get("q", "Colombo")
+        temp = 24 + sum(map(ord, city)) % 8
+        return httpx.Response(200, json={
+            "main": {"temp": temp, "humidity": 70 + len(city) % 20},
+            "weather": [{"description": "scattered clouds"}],
+        })
+
+    return httpx.MockTransport(handler)
+
+
+class FakeGoogleMaps:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def places(self, query: str):
+        time.sleep(self.latency)  # agent.find_place මේක thread එකක run කරනවා
+        city = find_city(query)
+        return {"status": "OK", "results": [
+            {"name": f"{city} Grand Hotel", "formatted_address": f"1 Main Street, {city}, Sri Lanka", "rating": 4.5},
+        ]}
+
+
+def install_agent_fakes(llm_latency: float = 0.3, tool_latency: float = 0.1, search_result_chars: int = 0):
+    """Swap the agent's LLM, Tavily, weather HTTP client and Maps client for fakes."""
+    import agent
+
+    fake_llm = FakeChatModel(latency=llm_latency)
+    fake_tools = [
+        make_fake_guide_tool(), make_fake_search_tool(tool_latency, search_result_chars),
+        agent.get_weather, agent.find_place,
+    ]
+    for getter in (agent.get_tools, agent.get_tools_by_name, agent.get_llm,
+                   agent.get_llm_with_tools, agent.get_llm_final_answer):
+        if hasattr(getter, "cache_clear"):  # දෙවෙනි පාර call කරද්දී get_llm / get_tools දැනටමත් fakes
+            getter.cache_clear()
+    agent.get_llm = lambda: fake_llm
+    agent.get_tools = lambda: fake_tools
+    agent._http_client = httpx.AsyncClient(transport=make_weather_transport(tool_latency))
+    agent._gmaps_client = FakeGoogleMaps(tool_latency)
+
+
+# --- Synthetic travel guide PDFs (ingest benchmarks) ---
+WORDS = (
+    "temple beach safari tea plantation train hike waterfall fort museum lagoon surf whale "
+    "spice market elephant rock fortress ruins stupa lake hill country coast sunrise curry "
+    "tuk-tuk bus ticket season monsoon festival perahera hotel guesthouse village"
+).split()
+
+
+def guide_pages(seed: int, pages: int, words_per_page: int = 450):
+    rng = random.Random(seed)
+    result = []
+    for page in range(pages):
+        city = CITIES[(seed + page) % len(CITIES)]
+        words = [rng.choice(WORDS) for _ in range(words_per_page)]
+        result.append(f"Travel guide for {city}, page {page + 1}. " + " ".join(words) + ".")
+    return result
+
+
+def write_pdf(path: str, pages: List[str]):
+    # Minimal PDF (Helvetica text) - PyPDFLoader එකට කියවන්න ඇති
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        2: f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in page_ids)}] /Count {len(pages)} >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for page_id, text in zip(page_ids, pages):
+        lines = [
+            line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            for line in textwrap.wrap(text, 95)
+        ]
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+        objects[page_id] = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        )
+        objects[page_id + 1] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+
+    out = b"%PDF-1.4\n"
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += f"{number} 0 obj\n{objects[number]}\nendobj\n".encode("latin-1")
+    xref_offset = len(out)
+    size = max(objects) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode()
+    for number in range(1, size):
+        out += f"{offsets[number]:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    pick = lambda p: values[min(len(values) - 1, int(len(values) * p))]
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
@@ -0,0 +1,83 @@
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+
+# Local gazetteer lookup latency (find_place එකේ Google call එකට කලින් path එක).
+# Synthetic places dump එකක් හදලා exact / fuzzy / "near X" / miss queries මනිනවා.
+#   python bench_gazetteer.py --places 5000
+
+TOWNS = {
+    "Colombo": (6.9271, 79.8612), "Kandy": (7.2906, 80.6337), "Ella": (6.8667, 81.0466),
+    "Galle": (6.0535, 80.2210), "Sigiriya": (7.9570, 80.7603), "Jaffna": (9.6615, 80.0255),
+    "Trincomalee": (8.5874, 81.2152), "Nuwara Eliya": (6.9497, 80.7891),
+}
+KINDS = ["Hotel", "Guesthouse", "Resort", "Restaurant", "Temple", "Beach", "Cafe", "Museum"]
+WORDS = ["Lotus", "Lake", "Hill", "Palm", "Royal", "Tea", "Lagoon", "Fort", "Sunset", "Elephant", "Spice", "Rock"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gazetteer lookup latency")
+    parser.add_argument("--places", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000, help="queries per kind")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+def write_places(path: str, count: int, rng: random.Random):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "category", "lat", "lon", "address", "rating", "town", "aliases"])
+        for town, (lat, lon) in TOWNS.items():
+            writer.writerow([town, "town", lat, lon, f"{town}, Sri Lanka", "", town, ""])
+        for i in range(count):
+            town = rng.choice(list(TOWNS))
+            lat, lon = TOWNS[town]
+            kind = rng.choice(KINDS)
+            name = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {kind} {i}"
+            writer.writerow([
+                name, kind.lower(), lat + rng.uniform(-0.1, 0.1), lon + rng.uniform(-0.1, 0.1),
+                f"{i} Main Street, {town}, Sri Lanka", round(rng.uniform(3, 5), 1), town, "",
+            ])
+
+
+def main():
+    args = parse_args()
+    from gazetteer import load_gazetteer
+    from bench_fakes import percentiles
+
+    rng = random.Random(args.seed)
+    workdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bench")
+    os.makedirs(workdir, exist_ok=True)
+    path = os.path.join(workdir, "gazetteer.csv")
+    write_places(path, args.places, rng)
+
+    start = time.perf_counter()
+    gazetteer = load_gazetteer(path)
+    print(f"loaded {len(gazetteer)} places in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    names = [place["name"] for place in gazetteer.places[len(TOWNS):]]
+    queries = {
+        "exact name": lambda: rng.choice(names),
+        "fuzzy name (typo)": lambda: rng.choice(names).replace("o", "0", 1).lower(),
+        "hotels near town": lambda: f"hotels near {rng.choice(list(TOWNS))}",
+        "temple in town 5 km": lambda: f"temples in {rng.choice(list(TOWNS))} within 5 km",
+        "miss (-> Google)": lambda: f"Blue Whale Watching Co {rng.randint(0, 10**6)}",
+    }
+    print(f"{'query':<22} {'answered':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label, make in queries.items():
+        latencies, answered = [], 0
+        for _ in range(args.queries):
+            query = make()
+            t0 = time.perf_counter()
+            answered += gazetteer.lookup(query) is not None
+            latencies.append((time.perf_counter() - t0) * 1000)
+        p = percentiles(latencies)
+        print(f"{label:<22} {answered / args.queries:>8.0%} {p['p50']:>9.3f} {p['p95']:>9.3f} {p['p99']:>9.3f}")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
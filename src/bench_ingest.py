@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import contextlib
+import io
+
+# ingest_data.ingest_docs සහ retrieval වල micro-benchmarks (network / model download නැතුව).
+# Synthetic PDFs + deterministic fake embeddings පාවිච්චි කරනවා.
+#   python bench_ingest.py --files 10 --pages 8
+
+QUERIES = ["best time to visit Ella", "temples in Kandy", "safari near Yala", "beaches in Galle"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline ingest and retrieval micro-benchmarks")
+    parser.add_argument("--files", type=int, default=10, help="synthetic guide PDFs")
+    parser.add_argument("--pages", type=int, default=8, help="pages per PDF")
+    parser.add_argument("--queries", type=int, default=200, help="retrieval queries per backend")
+    parser.add_argument("--dim", type=int, default=384, help="fake embedding size (MiniLM is 384)")
+    return parser.parse_args()
+
+
+def timed(label, fn, results):
+    # ingest_docs එකේ print output එක benchmark output එකට මිශ්‍ර නොවෙන්න
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        value = fn()
+        elapsed = time.perf_counter() - start
+    results.append((label, elapsed * 1000))
+    return value
+
+
+def main():
+    args = parse_args()
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    from langchain_community.vectorstores import Chroma
+    from bench_fakes import guide_pages, write_pdf, percentiles
+    from ingest_data import ingest_docs
+    from vector_index import MmapVectorIndex
+
+    workdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bench", "ingest")
+    shutil.rmtree(workdir, ignore_errors=True)
+    data_dir = os.path.join(workdir, "Data")
+    chroma_dir = os.path.join(workdir, "chroma_db")
+    index_dir = os.path.join(workdir, "vector_index")
+    os.makedirs(data_dir)
+    for i in range(args.files):
+        write_pdf(os.path.join(data_dir, f"guide_{i:03d}.pdf"), guide_pages(seed=i, pages=args.pages))
+
+    embeddings = DeterministicFakeEmbedding(size=args.dim)
+    run = lambda **kw: ingest_docs(embeddings=embeddings, data_dir=data_dir, chroma_dir=chroma_dir,
+                                   index_dir=index_dir, **kw)
+    results = []
+    timed(f"full ingest ({args.files} files x {args.pages} pages)", lambda: run(full=True), results)
+    timed("incremental rerun (no changes)", run, results)
+    write_pdf(os.path.join(data_dir, "guide_000.pdf"), guide_pages(seed=1000, pages=args.pages))
+    timed("incremental rerun (1 file changed)", run, results)
+    write_pdf(os.path.join(data_dir, "guide_new.pdf"), guide_pages(seed=2000, pages=args.pages))
+    timed("incremental rerun (1 file added)", run, results)
+    timed("export mmap index", lambda: run(export=True), results)
+
+    print(f"{'ingest step':<45} {'ms':>10}")
+    for label, elapsed_ms in results:
+        print(f"{label:<45} {elapsed_ms:>10.1f}")
+
+    query_vectors = [embeddings.embed_query(QUERIES[i % len(QUERIES)] + str(i)) for i in range(args.queries)]
+    vector_db = Chroma(persist_directory=chroma_dir, embedding_function=embeddings)
+    index = MmapVectorIndex(index_dir)
+    backends = {
+        "chroma": lambda v: vector_db.similarity_search_by_vector(v, k=3),
+        "mmap": lambda v: index.search(v, 3),
+    }
+    print(f"\n{'retrieval (k=3)':<20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, search in backends.items():
+        latencies = []
+        for vector in query_vectors:
+            start = time.perf_counter()
+            search(vector)
+            latencies.append((time.perf_counter() - start) * 1000)
+        p = percentiles(latencies)
+        print(f"{name:<20} {p['p50']:>9.3f} {p['p95']:>9.3f} {p['p99']:>9.3f}")
+    index.close()
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import json
+import time
+import resource
+import subprocess
+import statistics
+
+# Chroma vs memory-mapped index: load time, memory සහ query latency සංසන්දනය.
+# Backend එකක් process එකකින් මනින්න ඕන නිසා හැම backend එකක්ම වෙනම subprocess එකක run කරනවා.
+#   python bench_retrieval.py            -> chroma සහ mmap දෙකම
+#   python bench_retrieval.py chroma     -> එක backend එකක් විතරක් (JSON output)
+
+QUERIES = [
+    "best time to visit Ella",
+    "things to do in Kandy",
+    "how to get from Colombo to Galle",
+    "Sigiriya entrance ticket price",
+    "beaches in the south coast",
+    "what to see in Anuradhapura",
+    "safari in Yala national park",
+    "tea plantations in Nuwara Eliya",
+]
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "50"))
+K = 3
+
+
+def memory_kb():
+    # RssAnon = process එකේ private memory; RssFile = OS page cache එකෙන් share වෙන pages
+    usage = {"max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS", "RssAnon", "RssFile")):
+                    name, value = line.split(":")
+                    usage[name.lower() + "_kb"] = int(value.split()[0])
+    except OSError:
+        pass
+    return usage
+
+
+def run_backend(backend: str):
+    from rag import load_embeddings, load_vector_store
+    from vector_index import INDEX_DIR, MmapVectorIndex
+
+    embeddings = load_embeddings()
+    query_vectors = embeddings.embed_documents(QUERIES)
+    before = memory_kb()
+
+    start = time.perf_counter()
+    if backend == "mmap":
+        index = MmapVectorIndex(INDEX_DIR)
+        search = lambda vector: index.search(vector, K)
+    else:
+        vector_db = load_vector_store(embeddings)
+        search = lambda vector: vector_db.similarity_search_by_vector(vector, k=K)
+    search(query_vectors[0])  # Cold start එකට පළමු query එකත් ගණන් කරනවා
+    load_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    for _ in range(ROUNDS):
+        for vector in query_vectors:
+            t0 = time.perf_counter()
+            search(vector)
+            latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+
+    after = memory_kb()
+    return {
+        "backend": backend,
+        "load_ms": round(load_ms, 1),
+        "query_p50_ms": round(statistics.median(latencies), 3),
+        "query_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+        "memory_before": before,
+        "memory_after": after,
+    }
+
+
+def main():
+    if len(sys.argv) > 1:
+        print(json.dumps(run_backend(sys.argv[1])))
+        return
+
+    for backend in ("chroma", "mmap"):
+        output = subprocess.run(
+            [sys.executable, __file__, backend], capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        rss_delta = result["memory_after"].get("vmrss_kb", 0) - result["memory_before"].get("vmrss_kb", 0)
+        anon_delta = result["memory_after"].get("rssanon_kb", 0) - result["memory_before"].get("rssanon_kb", 0)
+        print(
+            f"{backend:>6}: load {result['load_ms']:8.1f} ms | "
+            f"query p50 {result['query_p50_ms']:7.3f} ms, p99 {result['query_p99_ms']:7.3f} ms | "
+            f"RSS +{rss_delta / 1024:.1f} MB (private +{anon_delta / 1024:.1f} MB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
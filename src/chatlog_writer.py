@@ -0,0 +1,246 @@
+import os
+import json
+import shutil
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+import models
+import metrics
+
+logger = logging.getLogger("tourism_api.chatlog_writer")
+
+
+class ChatLogWriter:
+    """Write-behind queue that bulk-inserts ChatLog rows in batches (by size or time window)."""
+
+    def __init__(self, session_factory, batch_size: int = 50, flush_interval: float = 0.5,
+                 max_buffer: int = 10000, spill_path: str = "./chatlog_spill.jsonl",
+                 dead_letter_path: str = "./chatlog_dead_letter.jsonl"):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.spill_path = spill_path
+        self.replay_path = f"{spill_path}.replay"
+        self.dead_letter_path = dead_letter_path
+        self.written = 0
+        self.spilled = 0
+        self.dead_lettered = 0
+        self.failed_flushes = 0
+        self._rows = deque()
+        # .replay file එකෙන් load කරපු chunk එක; file එක මකන්නේ මේවා flush වුණාට පස්සේ
+        self._replay_rows = deque()
+        self._replay_offset = 0  # .replay file එකේ ඊළඟට කියවන්න ඕන byte එක
+        self._overflow = []  # Buffer එක පිරිලා disk එකට යන්න ඉන්න rows
+        self._spill_task = None
+        self._spill_lock = None
+        self._wakeup = None
+        self._stop_event = None
+        self._task = None
+        self._stopping = False
+
+    def submit(self, user_id: int, thread_id: str, query: str, response: str):
+        row = {
+            "user_id": user_id,
+            "thread_id": thread_id,
+            "query": query,
+            "response": response,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        # DB down වෙලා buffer එක පිරුණොත් disk එකට (DB ආපහු ආවම replay වෙනවා);
+        # file write එක thread එකක, request එක disk එක එනකම් block වෙන්නේ නැහැ
+        if len(self._rows) >= self.max_buffer:
+            self._overflow.append(row)
+            if self._spill_task is None or self._spill_task.done():
+                self._spill_task = asyncio.create_task(self._drain_overflow())
+            return
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        self._stopping = False
+        self._wakeup = asyncio.Event()  # Running event loop එකට bind වෙන්න start එකේදී හදනවා
+        self._stop_event = asyncio.Event()
+        self._spill_lock = asyncio.Lock()
+        # කලින් run එකෙන් ඉතුරු වුණ .replay / spill files _run loop එකෙන් chunk වලින් replay වෙනවා
+        self._replay_offset = 0
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Graceful shutdown: queue එකේ ඉතුරු ඒවා flush කරනවා, බැරි නම් disk එකට
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._stop_event is not None:
+            self._stop_event.set()  # Backoff sleep එකේ ඉන්නවා නම් ඇහැරවනවා
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if self._spill_task is not None:
+            await self._spill_task
+            self._spill_task = None
+        while self._rows:
+            if not await self._flush_batch(self._rows):
+                await self._spill(list(self._rows))
+                self._rows.clear()
+        while self._replay_rows and await self._flush_batch(self._replay_rows):
+            pass
+        if self._replay_rows or self._replay_offset:
+            # Flush වුණ කොටස .replay file එකෙන් අයින් කරනවා (ඊළඟ start එකේ duplicates නොවෙන්න)
+            async with self._spill_lock:
+                await asyncio.to_thread(self._trim_replay, list(self._replay_rows), self._replay_offset)
+            self._replay_rows.clear()
+            self._replay_offset = 0
+
+    async def _run(self):
+        backoff = 1
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while not self._stopping:
+                if not self._rows and not self._replay_rows and not await self._load_replay_chunk():
+                    break
+                rows = self._rows if self._rows else self._replay_rows
+                if not await self._flush_batch(rows):
+                    # DB down: rows memory එකේ තියාගෙන backoff එක්ක ආයේ try කරනවා (stop() ආවොත් ඉක්මනින් නවතිනවා)
+                    try:
+                        await asyncio.wait_for(self._stop_event.wait(), timeout=backoff)
+                    except asyncio.TimeoutError:
+                        pass
+                    backoff = min(backoff * 2, 30)
+                    break
+                backoff = 1
+
+    async def _flush_batch(self, rows):
+        batch = [rows.popleft() for _ in range(min(self.batch_size, len(rows)))]
+        try:
+            await self._insert(batch)
+        except (IntegrityError, DataError) as e:
+            # Retry කරලා හරි යන්නේ නැති rows (e.g. නැති user_id එකක්): එකින් එක insert කරලා
+            # නරක ඒවා විතරක් dead-letter file එකට, අනිත් ඒවා block නොවී DB එකට
+            logger.warning("ChatLog batch of %d rows rejected (%s), inserting row by row", len(batch), e)
+            return await self._insert_each(batch, rows)
+        except Exception as e:
+            self.failed_flushes += 1
+            rows.extendleft(reversed(batch))
+            logger.warning("ChatLog flush of %d rows failed: %s", len(batch), e)
+            return False
+        self.written += len(batch)
+        return True
+
+    async def _insert_each(self, batch, rows):
+        for i, row in enumerate(batch):
+            try:
+                await self._insert([row])
+            except (IntegrityError, DataError) as e:
+                await self._dead_letter(row, e)
+            except Exception as e:
+                # මැදදී DB එක down වුණොත් ඉතුරු rows ආපහු queue එකේ මුලට
+                self.failed_flushes += 1
+                rows.extendleft(reversed(batch[i:]))
+                logger.warning("ChatLog row insert failed: %s", e)
+                return False
+            else:
+                self.written += 1
+        return True
+
+    async def _insert(self, batch):
+        rows = [{**row, "timestamp": datetime.fromisoformat(row["timestamp"])} for row in batch]
+        with metrics.observe_db("chatlog_batch_insert"):
+            async with self.session_factory() as db:
+                await db.execute(insert(models.ChatLog), rows)
+                await db.commit()
+
+    async def _drain_overflow(self):
+        while self._overflow:
+            rows, self._overflow = self._overflow, []
+            await self._spill(rows)
+
+    async def _spill(self, rows):
+        async with self._spill_lock:
+            await asyncio.to_thread(append_lines, self.spill_path, rows)
+        self.spilled += len(rows)
+        logger.warning("Spilled %d ChatLog rows to %s", len(rows), self.spill_path)
+
+    async def _dead_letter(self, row, error):
+        await asyncio.to_thread(append_lines, self.dead_letter_path, [{**row, "error": str(error).splitlines()[0]}])
+        self.dead_lettered += 1
+        logger.error("ChatLog row for user %s moved to %s: %s", row.get("user_id"), self.dead_letter_path, error)
+
+    async def _load_replay_chunk(self):
+        # Spilled rows max_buffer ගාණේ chunks වලින් (පරණ .replay එක ඉවර වුණාම අලුත් spill file එක)
+        async with self._spill_lock:
+            rows, bad, self._replay_offset = await asyncio.to_thread(self._read_replay_chunk, self._replay_offset)
+        for line, error in bad:
+            # Crash එකකින් අඩක් ලියවුණ line එකක් වගේ: start එක නවත්තන්නේ නැතුව dead-letter එකට
+            await self._dead_letter({"raw": line}, error)
+        if rows:
+            self._replay_rows.extend(rows)
+            logger.info("Replaying %d spilled ChatLog rows", len(rows))
+        return bool(rows or bad)
+
+    def _read_replay_chunk(self, offset: int):
+        if not os.path.exists(self.replay_path):
+            if not os.path.exists(self.spill_path):
+                return [], [], 0
+            os.replace(self.spill_path, self.replay_path)
+            offset = 0
+        rows, bad = [], []
+        with open(self.replay_path, "rb") as f:
+            f.seek(offset)
+            while len(rows) < self.max_buffer:
+                line = f.readline()
+                if not line:
+                    break
+                offset = f.tell()
+                text = line.decode("utf-8", errors="replace").strip()
+                if not text:
+                    continue
+                try:
+                    row = json.loads(text)
+                    if not isinstance(row, dict) or "timestamp" not in row:
+                        raise ValueError("not a ChatLog row")
+                except ValueError as e:
+                    bad.append((text, e))
+                    continue
+                rows.append(row)
+        if not rows and not bad:
+            # මේක call වෙන්නේ කලින් chunk එක flush වුණාට පස්සේ විතරයි: file එකේ ඔක්කොම DB එකේ
+            os.remove(self.replay_path)
+            offset = 0
+        return rows, bad, offset
+
+    def _trim_replay(self, pending, offset: int):
+        if not os.path.exists(self.replay_path):
+            return
+        tmp_path = f"{self.replay_path}.tmp"
+        with open(self.replay_path, "rb") as src, open(tmp_path, "wb") as dst:
+            for row in pending:
+                dst.write((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8"))
+            src.seek(offset)
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, self.replay_path)
+
+    def stats(self):
+        return {
+            "queued": len(self._rows),
+            "replaying": len(self._replay_rows),
+            "written": self.written,
+            "spilled": self.spilled,
+            "dead_lettered": self.dead_lettered,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+def append_lines(path: str, rows):
+    with open(path, "a", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
@@ -0,0 +1,111 @@
+import os
+import asyncio
+import logging
+from typing import List, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+# call_model එකට යවන prompt එක සීමා කරනවා (state එකේ messages වෙනස් කරන්නේ නැහැ):
+#   1. දැන් run වෙන turn එක (අන්තිම HumanMessage එකේ ඉඳන්) හැමවිටම සම්පූර්ණයෙන්
+#   2. කලින් turns වල tool outputs කෙටි කරනවා
+#   3. budget එක ඉක්මවුවොත් පරණම turns rolling summary එකකට එකතු කරනවා
+# Summary එක AgentState එකේ (checkpointer එකේ) තියෙන නිසා හැම turn එකකම ආයේ හදන්නේ නැහැ.
+
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "3000"))
+# Budget එක ඉක්මවුවාම මේ ප්‍රමාණයට අඩු වෙනකම් fold කරනවා (summary call එක හැම turn එකකම නොවෙන්න)
+CONTEXT_TARGET_TOKENS = int(os.getenv("CONTEXT_TARGET_TOKENS", str(CONTEXT_MAX_TOKENS // 2)))
+STALE_TOOL_RESULT_CHARS = int(os.getenv("STALE_TOOL_RESULT_CHARS", "300"))
+CONTEXT_SUMMARIZE = os.getenv("CONTEXT_SUMMARIZE", "1") == "1"
+
+SUMMARY_PROMPT = """Summarize this conversation between a tourist and a Sri Lanka travel concierge.
+Keep cities, dates, budgets, preferences, weather and places already found. At most 120 words.
+
+Earlier summary:
+{summary}
+
+New messages:
+{transcript}"""
+
+logger = logging.getLogger("tourism_api.context")
+
+
+def count_tokens(messages: List[BaseMessage]):
+    return count_tokens_approximately(messages)
+
+
+def current_turn_start(messages: List[BaseMessage]):
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return i
+    return 0
+
+
+def turn_starts(messages: List[BaseMessage], start: int, end: int):
+    # Turns වලින් විතරක් කපනවා: AI tool_calls එකයි ඒකේ ToolMessages ටිකයි වෙන් නොවෙන්න
+    return [i for i in range(start, end) if isinstance(messages[i], HumanMessage)] + [end]
+
+
+def shorten_stale_tools(messages: List[BaseMessage]):
+    shortened = []
+    for message in messages:
+        if isinstance(message, ToolMessage) and len(str(message.content)) > STALE_TOOL_RESULT_CHARS:
+            content = str(message.content)[:STALE_TOOL_RESULT_CHARS] + " ...[truncated]"
+            message = message.model_copy(update={"content": content})
+        shortened.append(message)
+    return shortened
+
+
+def transcript(messages: List[BaseMessage]):
+    lines = []
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            lines.append(f"Tool {message.name}: {message.content}")
+        elif message.content:
+            lines.append(f"{'User' if isinstance(message, HumanMessage) else 'Assistant'}: {message.content}")
+    return "\n".join(lines)
+
+
+def summary_prompt(summary: Optional[str], messages: List[BaseMessage]):
+    return [HumanMessage(content=SUMMARY_PROMPT.format(summary=summary or "(none)", transcript=transcript(messages)))]
+
+
+async def summarize(llm, summary: Optional[str], messages: List[BaseMessage]):
+    # Graph එකේ callbacks වලින් detach කරනවා: නැත්නම් /chat/stream එකේ summary text එක tokens විදිහට යනවා
+    response = await llm.ainvoke(summary_prompt(summary, messages), config={"callbacks": []})
+    return str(response.content).strip()
+
+
+async def compact(system_prompt: str, messages: List[BaseMessage], summary: Optional[str], summarized: int, llm,
+                  timeout: Optional[float] = None):
+    """Return (prompt messages, summary, summarized) for one call_model step (summary call bounded by `timeout`)."""
+    current = current_turn_start(messages)
+    history = shorten_stale_tools(messages[summarized:current])
+    turn = messages[current:]
+
+    fixed = count_tokens([SystemMessage(content=system_prompt)] + turn)
+    if fixed + count_tokens(history) > CONTEXT_MAX_TOKENS and history:
+        # පරණම turns එකින් එක අයින් කරනවා history එක target එකට අඩු වෙනකම්
+        starts = turn_starts(history, 0, len(history))
+        budget = max(CONTEXT_TARGET_TOKENS - fixed, 0)
+        cut = starts[-1]
+        for start in starts:
+            if count_tokens(history[start:]) <= budget:
+                cut = start
+                break
+        folded, history = history[:cut], history[cut:]
+        if CONTEXT_SUMMARIZE and folded and (timeout is None or timeout > 0):
+            try:
+                summary = await asyncio.wait_for(summarize(llm, summary, folded), timeout=timeout)
+            except asyncio.TimeoutError:
+                # Request deadline එකට කලින් summary එක ආවේ නැහැ: පරණ summary එක + trimming විතරයි
+                logger.warning("Context summary timed out after %.1fs, trimming only", timeout)
+            except Exception as e:
+                # Summary එක fail වුණත් window එක වැඩ (පරණ summary එක තියාගන්නවා)
+                logger.warning("Context summary failed: %s", e)
+        summarized += cut
+
+    prompt = [SystemMessage(content=system_prompt)]
+    if summary:
+        prompt.append(SystemMessage(content=f"Summary of the earlier conversation:\n{summary}"))
+    return prompt + history + turn, summary, summarized
@@ -0,0 +1,181 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import List
+
+import requests
+from langchain_core.embeddings import Embeddings
+
+from cache import TTLCache, normalize_key
+
+# ingest_data.py, rag.py (app.py / test_chat.py) සහ agent එක එකම embedding model එක පාවිච්චි කරනවා.
+#   EMBEDDING_SERVICE_URL නැත්නම් -> process එක ඇතුලේ model එක (process එකකට එක පාරයි load වෙන්නේ)
+#   EMBEDDING_SERVICE_URL=http://127.0.0.1:8100 -> `python embedding_service.py` local service එකට
+# එකම වෙලාවේ එන queries පොඩි window එකක් ඇතුලේ එක batch එකකට එකතු කරලා embed කරනවා.
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBED_DEVICE = os.getenv("EMBED_DEVICE", "cpu")
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0"))  # 0 = torch default
+EMBED_BATCH_WINDOW = float(os.getenv("EMBED_BATCH_WINDOW_MS", "2")) / 1000
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "32"))
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "2048"))
+EMBED_CACHE_TTL = float(os.getenv("EMBED_CACHE_TTL", str(24 * 3600)))
+EMBEDDING_SERVICE_URL = os.getenv("EMBEDDING_SERVICE_URL")
+EMBEDDING_SERVICE_PORT = int(os.getenv("EMBEDDING_SERVICE_PORT", "8100"))
+
+
+class MicroBatcher:
+    """Collects texts submitted from many threads and embeds them in one model call."""
+
+    def __init__(self, embed_batch, window: float = EMBED_BATCH_WINDOW, max_batch: int = EMBED_MAX_BATCH):
+        self.embed_batch = embed_batch
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, text: str) -> Future:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+                self._thread.start()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _collect(self):
+        # පළමු item එක ආවට පස්සේ window එක ඉවර වෙනකම් හෝ batch එක පිරෙනකම් බලාගෙන ඉන්නවා
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            # කලින් batch එක run වෙද්දී queue වෙච්ච ඒවා window=0 උනත් එකතු වෙනවා
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = list(dict.fromkeys(text for text, _ in batch))  # batch එක ඇතුලේ duplicates එක පාරයි
+            try:
+                vectors = dict(zip(texts, self.embed_batch(texts)))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for text, future in batch:
+                future.set_result(vectors[text])
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+class SharedEmbeddings(Embeddings):
+    """Query embeddings go through an LRU cache and the micro-batcher; documents go straight to the model."""
+
+    def __init__(self, base: Embeddings, window: float = EMBED_BATCH_WINDOW, max_batch: int = EMBED_MAX_BATCH,
+                 cache_size: int = EMBED_CACHE_SIZE, cache_ttl: float = EMBED_CACHE_TTL):
+        self.base = base
+        self.batcher = MicroBatcher(base.embed_documents, window=window, max_batch=max_batch)
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Ingest එක දැනටමත් batches විදිහට එවන නිසා cache / batcher එක මගහරිනවා
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        # MiniLM uncased නිසා lowercase/whitespace normalize කරාට vector එක වෙනස් වෙන්නේ නැහැ
+        key = normalize_key(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.batcher.submit(key).result()
+            self.cache.set(key, vector)
+        return list(vector)
+
+    def stats(self):
+        return {"cache": self.cache.stats(), "batching": self.batcher.stats()}
+
+
+class RemoteEmbeddings(Embeddings):
+    """Client for a running `python embedding_service.py` (model loaded once for all processes)."""
+
+    def __init__(self, base_url: str, timeout: float = 30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _embed(self, texts: List[str], query: bool):
+        res = self.session.post(f"{self.base_url}/embed", json={"texts": texts, "query": query}, timeout=self.timeout)
+        res.raise_for_status()
+        return res.json()["vectors"]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, query=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], query=True)[0]
+
+
+def load_model():
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    if EMBED_THREADS:
+        import torch
+        torch.set_num_threads(EMBED_THREADS)
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL,
+        model_kwargs={"device": EMBED_DEVICE},
+        encode_kwargs={"batch_size": EMBED_MAX_BATCH},
+    )
+
+
+@lru_cache
+def get_embeddings():
+    if EMBEDDING_SERVICE_URL:
+        return RemoteEmbeddings(EMBEDDING_SERVICE_URL)
+    return SharedEmbeddings(load_model())
+
+
+def create_service(embeddings: SharedEmbeddings):
+    from fastapi import FastAPI
+    from pydantic import BaseModel
+
+    service = FastAPI(title="Embedding service")
+
+    class EmbedRequest(BaseModel):
+        texts: List[str]
+        query: bool = True
+
+    # sync endpoints threadpool එකේ run වෙන නිසා එකම වෙලාවේ එන requests batcher එකේ එකතු වෙනවා
+    @service.post("/embed")
+    def embed(request: EmbedRequest):
+        if request.query:
+            return {"vectors": [embeddings.embed_query(text) for text in request.texts]}
+        return {"vectors": embeddings.embed_documents(request.texts)}
+
+    @service.get("/stats")
+    def stats():
+        return embeddings.stats()
+
+    return service
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(create_service(SharedEmbeddings(load_model())), host="127.0.0.1", port=EMBEDDING_SERVICE_PORT)
@@ -1,11 +1,19 @@
 import streamlit as st
 import requests
+from backend_client import BackendClient
 
 # 1. Page Configuration
 st.set_page_config(page_title="LankaGuide AI", page_icon="🐘", layout="wide")
 
 BASE_URL = "http://127.0.0.1:8000"
 
+@st.cache_resource
+def get_client():
+    # Reruns සහ sessions අතර එකම keep-alive connection pool එක
+    return BackendClient(BASE_URL)
+
+client = get_client()
+
 # --- Styling ---
 st.markdown("""
     <style>
@@ -22,6 +30,37 @@ if "username" not in st.session_state:
     st.session_state.username = ""
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "history_cursor" not in st.session_state:
+    st.session_state.history_cursor = None
+if "thread_id" not in st.session_state:
+    st.session_state.thread_id = None
+if "history_cache" not in st.session_state:
+    st.session_state.history_cache = {}  # (user_id, cursor, limit) -> {"etag", "page"}
+
+def stream_chat(payload, status_box):
+    # Backend එකෙන් එන SSE events කියවලා tokens එන ගමන්ම placeholder එකේ පෙන්වනවා
+    answer_box = st.empty()
+    answer = ""
+    for event, data in client.chat_stream(payload):
+        if event == "token":
+            answer += data["content"]
+            answer_box.markdown(answer + "▌")
+        elif event == "reset":
+            # ඒ LLM call එක tool call එකකින් ඉවර වුණා: ඒ text එක අන්තිම උත්තරයේ නැහැ
+            answer = ""
+            answer_box.empty()
+        elif event == "tool_start":
+            status_box.caption(f"🔧 Using {data['tool']}...")
+        elif event == "tool_end":
+            status_box.empty()
+        elif event == "done":
+            # Save වුණ උත්තරයම පෙන්වනවා; ඊළඟ message එක මේ conversation එකටම යන්න thread_id එක මතක තියාගන්නවා
+            answer = data["ai_response"]
+            st.session_state.thread_id = data["thread_id"]
+        elif event == "error":
+            raise RuntimeError(data["detail"])
+    answer_box.markdown(answer)
+    return answer
 
 # --- SIDEBAR ---
 with st.sidebar:
@@ -33,6 +72,7 @@ with st.sidebar:
         # 1. NEW CHAT BUTTON
         if st.button("➕ New Chat", use_container_width=True):
             st.session_state.messages = [] # Screen එක Clear කරන්න
+            st.session_state.thread_id = None
             st.rerun()
 
         st.divider()
@@ -41,27 +81,50 @@ with st.sidebar:
         if st.button("Logout", use_container_width=True):
             st.session_state.user_id = None
             st.session_state.messages = []
+            st.session_state.thread_id = None
+            st.session_state.history_cursor = None
+            st.session_state.history_cache = {}
             st.rerun()
         
         st.divider()
         st.subheader("📜 Chat History")
         
-        # 3. HISTORY LOADING & CLICKING
+        # 3. HISTORY LOADING & CLICKING (conversation එකකට එක item එකක්, අලුත්ම ඒවා උඩින්, page එකකට 20 බැගින්)
+        # වෙනසක් නැත්නම් backend එකෙන් 304 එනවා, page එක session cache එකෙන්
         try:
-            history_res = requests.get(f"{BASE_URL}/history/{st.session_state.user_id}")
-            if history_res.status_code == 200:
-                chat_data = history_res.json()
-                # අලුත්ම ඒවා උඩින් පෙන්වන්න
-                for chat in reversed(chat_data):
-                    # Button එකක් විදිහට පෙන්වන්න. Click කළාම ඒ Chat එක Load වෙනවා
-                    if st.button(f"💬 {chat['query'][:30]}...", key=chat['id']):
-                        # පරණ Chat එක Click කළාම Session එකට දාගන්න
-                        st.session_state.messages = [
-                            {"role": "user", "content": chat['query']},
-                            {"role": "assistant", "content": chat['response']}
-                        ]
-                        st.rerun()
-        except Exception as e:
+            page = client.thread_page(
+                st.session_state.user_id,
+                cursor=st.session_state.history_cursor,
+                limit=20,
+                cache=st.session_state.history_cache,
+            )
+            for chat in page["items"]:
+                # Button එකක් විදිහට පෙන්වන්න. Click කළාම ඒ conversation එකේ turns ඔක්කොම Load වෙනවා
+                label = f"💬 {chat['query'][:30]}..." + (f" ({chat['turns']})" if chat["turns"] > 1 else "")
+                if st.button(label, key=f"thread-{chat['chat_id']}"):
+                    if chat["thread_id"]:
+                        # Agent එක resume කරන thread එකේ context එකම screen එකේත්
+                        turns = client.thread(st.session_state.user_id, chat["thread_id"])["turns"]
+                    else:
+                        # thread_id නැති පරණ chat එකක් (තනි Q/A එකක්)
+                        turns = [client.conversation(st.session_state.user_id, chat["chat_id"])]
+                    st.session_state.messages = [
+                        message
+                        for turn in turns
+                        for message in ({"role": "user", "content": turn["query"]},
+                                        {"role": "assistant", "content": turn["response"]})
+                    ]
+                    st.session_state.thread_id = chat["thread_id"]
+                    st.rerun()
+
+            col_newer, col_older = st.columns(2)
+            if st.session_state.history_cursor and col_newer.button("⏮ Newest"):
+                st.session_state.history_cursor = None
+                st.rerun()
+            if page["next_cursor"] and col_older.button("Older ▶"):
+                st.session_state.history_cursor = page["next_cursor"]
+                st.rerun()
+        except requests.RequestException:
             st.error("Could not load history.")
 
 # --- MAIN INTERFACE ---
@@ -75,7 +138,7 @@ if not st.session_state.user_id:
         login_pwd = st.text_input("Password", type="password", key="l_pwd")
         if st.button("Login"):
             try:
-                res = requests.post(f"{BASE_URL}/login", params={"email": login_email, "password": login_pwd})
+                res = client.login(login_email, login_pwd)
                 if res.status_code == 200:
                     st.session_state.user_id = 1  # Example ID
                     st.session_state.username = login_email.split('@')[0]
@@ -92,7 +155,7 @@ if not st.session_state.user_id:
         s_pwd = st.text_input("Password", type="password")
         if st.button("Sign Up"):
             try:
-                res = requests.post(f"{BASE_URL}/signup", params={"username": s_user, "email": s_email, "password": s_pwd})
+                res = client.signup(s_user, s_email, s_pwd)
                 if res.status_code == 200:
                     st.session_state.user_id = res.json()["user_id"]
                     st.session_state.username = s_user
@@ -119,24 +182,26 @@ else:
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        # 2. Backend එකට Request යැවීම (History එකත් එක්ක)
+        # 2. Backend එකට Request යැවීම (History එක server එකේ thread එකේ තියෙනවා)
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    # මෙන්න වෙනස් කරපු තැන: JSON Body එකක් විදිහට යවනවා
-                    payload = {
-                        "user_query": prompt,
-                        "user_id": st.session_state.user_id,
-                        "history": st.session_state.messages[:-1] # අන්තිම මැසේජ් එක ඇරෙන්න පරණ ඒවා ටික යවනවා
-                    }
-                    
-                    response = requests.post(f"{BASE_URL}/chat", json=payload)
-                    
-                    if response.status_code == 200:
-                        answer = response.json()["ai_response"]
-                        st.markdown(answer)
-                        st.session_state.messages.append({"role": "assistant", "content": answer})
-                    else:
-                        st.error(f"Error: {response.status_code}")
-                except Exception as e:
-                    st.error(f"Connection Failed: {e}")
\ No newline at end of file
+            try:
+                # මෙන්න වෙනස් කරපු තැන: JSON Body එකක් විදිහට යවනවා
+                payload = {
+                    "user_query": prompt,
+                    "user_id": st.session_state.user_id,
+                    "thread_id": st.session_state.thread_id
+                }
+
+                # Tokens එන ගමන්ම screen එකේ පෙන්වනවා
+                status_box = st.empty()
+                answer = stream_chat(payload, status_box)
+                status_box.empty()
+                st.session_state.messages.append({"role": "assistant", "content": answer})
+            except requests.HTTPError as e:
+                if e.response.status_code in (429, 503):
+                    # Backend එක busy / rate limited: Retry-After එක පෙන්වනවා
+                    st.warning(f"The concierge is busy, please try again in {e.response.headers.get('Retry-After', 'a few')} seconds.")
+                else:
+                    st.error(f"Error: {e.response.status_code}")
+            except Exception as e:
+                st.error(f"Connection Failed: {e}")
\ No newline at end of file
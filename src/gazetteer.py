@@ -0,0 +1,263 @@
+import os
+import re
+import csv
+import json
+import math
+import difflib
+import logging
+from collections import defaultdict
+from typing import List, Optional
+
+import numpy as np
+
+# Google Places API එකට යන්න කලින් බලන local Sri Lanka places dump එක (CSV / GeoJSON).
+#   CSV columns: name, category, lat, lon, address, rating, town, aliases (| වලින් වෙන් කරලා)
+#   GeoJSON: Point features, properties වල එම fields
+# Names -> exact + trigram fuzzy index, coordinates -> grid (geohash වගේ cells) spatial index.
+
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "./gazetteer.csv")
+NEAR_RADIUS_KM = float(os.getenv("GAZETTEER_NEAR_RADIUS_KM", "15"))
+IN_RADIUS_KM = float(os.getenv("GAZETTEER_IN_RADIUS_KM", "8"))
+MATCH_THRESHOLD = float(os.getenv("GAZETTEER_MATCH_THRESHOLD", "0.9"))
+MAX_RESULTS = int(os.getenv("GAZETTEER_MAX_RESULTS", "3"))
+
+logger = logging.getLogger("tourism_api.gazetteer")
+
+EARTH_RADIUS_KM = 6371.0
+CELL_DEG = 0.05  # ~5.5 km cells
+KM_PER_DEG = 111.32
+
+# "hotels near Kandy within 5 km", "guesthouse in Ella", "restaurants around Galle Fort"
+NEAR_PATTERN = re.compile(
+    r"^(?P<what>.*?)\s*\b(?P<prep>near|in|around|close to|at)\s+(?P<where>.+?)"
+    r"(?:\s+within\s+(?P<km>\d+)\s*km)?$"
+)
+# "things to do in X" වගේ category filter එකක් නැති ඒවා
+ANY_PLACE = {"", "place", "places", "things to do", "attractions", "what to see", "sights"}
+CATEGORY_SYNONYMS = {
+    "hotel": {"hotel", "resort", "guesthouse", "guest house", "villa", "hostel", "homestay", "stay", "accommodation"},
+    "restaurant": {"restaurant", "cafe", "food", "eat", "dining"},
+    "beach": {"beach", "bay"},
+    "temple": {"temple", "kovil", "vihara", "stupa", "dagoba"},
+}
+
+
+def normalize_name(text: str):
+    text = re.sub(r"[^a-z0-9 ]+", " ", text.lower())
+    return " ".join(word for word in text.split() if word != "the")
+
+
+def trigrams(text: str):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def singular(word: str):
+    return word[:-1] if word.endswith("s") and not word.endswith("ss") else word
+
+
+class Gazetteer:
+    """In-memory place index: fuzzy name lookup plus radius / "near X" queries."""
+
+    def __init__(self, places: List[dict]):
+        self.places = places
+        self.lat = np.array([p["lat"] for p in places], dtype=np.float64)
+        self.lon = np.array([p["lon"] for p in places], dtype=np.float64)
+        self._names = defaultdict(list)  # normalized name / alias -> place indexes
+        self._grid = defaultdict(list)  # (lat cell, lon cell) -> place indexes
+        # Category filter එකට normalized "category + name" එක කලින්ම හදලා තියනවා
+        self._haystacks = [f" {normalize_name(p.get('category', ''))} {normalize_name(p['name'])} " for p in places]
+        for i, place in enumerate(places):
+            for name in [place["name"], *place.get("aliases", [])]:
+                key = normalize_name(name)
+                if key:
+                    self._names[key].append(i)
+            self._grid[self._cell(place["lat"], place["lon"])].append(i)
+        # trigram -> name ids (numpy) ; fuzzy match එකේ overlap එක bincount එකකින්
+        self._name_list = list(self._names)
+        postings = defaultdict(list)
+        for name_id, key in enumerate(self._name_list):
+            for gram in trigrams(key):
+                postings[gram].append(name_id)
+        self._trigrams = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.places)
+
+    @staticmethod
+    def _cell(lat: float, lon: float):
+        return int(math.floor(lat / CELL_DEG)), int(math.floor(lon / CELL_DEG))
+
+    # --- Names ---
+    def match(self, name: str, threshold: float = MATCH_THRESHOLD) -> Optional[int]:
+        key = normalize_name(name)
+        if not key:
+            return None
+        candidates = [key] if key in self._names else self._fuzzy_candidates(key, threshold)
+        if not candidates:
+            return None
+        # එකම නමින් කිහිපයක් තියෙනවා නම් rating එක වැඩිම එක
+        return max((i for c in candidates for i in self._names[c]), key=lambda i: self.places[i].get("rating") or 0)
+
+    def _fuzzy_candidates(self, key: str, threshold: float):
+        hits = [self._trigrams[gram] for gram in trigrams(key) if gram in self._trigrams]
+        if not hits:
+            return []
+        overlap = np.bincount(np.concatenate(hits), minlength=len(self._name_list))
+        top = np.argpartition(-overlap, min(20, len(overlap) - 1))[:20]
+        shortlist = [self._name_list[i] for i in top if overlap[i]]
+        scored = []
+        for name in shortlist:
+            matcher = difflib.SequenceMatcher(None, key, name)
+            # quick_ratio එක upper bound එකක් නිසා ratio() (slow) එක ඕන වෙන්නේ ටික දෙනෙකුට විතරයි
+            if matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold:
+                scored.append((matcher.ratio(), name))
+        if not scored:
+            return []
+        best = max(score for score, _ in scored)
+        return [name for score, name in scored if score == best]
+
+    # --- Space ---
+    def within(self, lat: float, lon: float, radius_km: float):
+        """(index, km) pairs inside the radius, nearest first (lazy, so callers can stop early)."""
+        lat_span = int(math.ceil(radius_km / (KM_PER_DEG * CELL_DEG)))
+        lon_span = int(math.ceil(radius_km / (KM_PER_DEG * CELL_DEG * max(math.cos(math.radians(lat)), 0.1))))
+        lat_cell, lon_cell = self._cell(lat, lon)
+        candidates = [
+            i
+            for dlat in range(-lat_span, lat_span + 1)
+            for dlon in range(-lon_span, lon_span + 1)
+            for i in self._grid.get((lat_cell + dlat, lon_cell + dlon), ())
+        ]
+        if not candidates:
+            return []
+        idx = np.array(candidates)
+        distances = haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+        inside = distances <= radius_km
+        idx, distances = idx[inside], distances[inside]
+        order = np.argsort(distances)
+        return zip(idx[order].tolist(), distances[order].tolist())
+
+    def near(self, anchor: str, category: Optional[str] = None, radius_km: float = NEAR_RADIUS_KM,
+             limit: int = MAX_RESULTS):
+        origin = self.match(anchor)
+        if origin is None:
+            return None, []
+        place = self.places[origin]
+        hits = []
+        for i, km in self.within(place["lat"], place["lon"], radius_km):
+            if i != origin and self._is_category(i, category):
+                hits.append((i, km))
+                if len(hits) == limit:
+                    break
+        return place, hits
+
+    def _is_category(self, i: int, category: Optional[str]):
+        if category is None:
+            return True
+        haystack = self._haystacks[i]
+        words = CATEGORY_SYNONYMS.get(category, {category})
+        return any(f" {word} " in haystack or f" {word}s " in haystack for word in words)
+
+    # --- find_place ---
+    def lookup(self, query: str) -> Optional[str]:
+        """find_place answer from local data, or None so the caller falls back to Google."""
+        text = normalize_name(query)
+        if text in self._names:
+            return f"Found: {format_place(self.places[self.match(text)])}"
+        near = NEAR_PATTERN.match(text)
+        if near:
+            what = near.group("what").strip()
+            default_radius = IN_RADIUS_KM if near.group("prep") in ("in", "at") else NEAR_RADIUS_KM
+            radius = float(near.group("km")) if near.group("km") else default_radius
+            # "Temple of the Tooth in Kandy": "what" එක place name එකක් නම් category search එකට කලින් ඒක
+            named = self._named_near(what, near.group("where"), radius)
+            if named is not None:
+                return f"Found: {format_place(self.places[named])}"
+            category = None if what in ANY_PLACE else self._category(what)
+            anchor, hits = self.near(near.group("where"), category, radius)
+            if anchor is not None and hits:
+                listed = "; ".join(f"{format_place(self.places[i])}, {km:.1f} km" for i, km in hits)
+                return f"Found near {anchor['name']}: {listed}"
+        i = self.match(text)
+        return f"Found: {format_place(self.places[i])}" if i is not None else None
+
+    def _named_near(self, what: str, where: str, radius_km: float) -> Optional[int]:
+        if what in ANY_PLACE or any(singular(what) in synonyms for synonyms in CATEGORY_SYNONYMS.values()):
+            return None
+        i = self.match(what)
+        if i is None:
+            return None
+        origin = self.match(where)
+        if origin is None:
+            return i
+        # එකම නමින් වෙන තැනක තියෙන place එකක් නම් "near Y" query එකට ගැලපෙන්නේ නැහැ
+        place, anchor = self.places[i], self.places[origin]
+        km = float(haversine_km(anchor["lat"], anchor["lon"], place["lat"], place["lon"]))
+        return i if km <= radius_km else None
+
+    @staticmethod
+    def _category(what: str):
+        words = [singular(word) for word in what.split()]
+        for category, synonyms in CATEGORY_SYNONYMS.items():
+            if any(word in synonyms for word in words) or what in synonyms:
+                return category
+        return words[-1]
+
+
+def haversine_km(lat, lon, lats, lons):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat, lon, lats, lons))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def format_place(place: dict):
+    # Google find_place result එකේ format එකම
+    return f"{place['name']}, Address: {place.get('address') or 'N/A'}, Rating: {place.get('rating') or 'N/A'}"
+
+
+def parse_place(row: dict):
+    lat, lon = float(row["lat"]), float(row["lon"])
+    if not (math.isfinite(lat) and math.isfinite(lon)):
+        raise ValueError(f"invalid coordinates {row['lat']!r}, {row['lon']!r}")
+    aliases = row.get("aliases") or []
+    if isinstance(aliases, str):
+        aliases = [alias.strip() for alias in aliases.split("|") if alias.strip()]
+    rating = row.get("rating")
+    return {
+        "name": row["name"].strip(),
+        "category": (row.get("category") or "").strip(),
+        "lat": lat,
+        "lon": lon,
+        "address": (row.get("address") or "").strip(),
+        "rating": float(rating) if rating not in (None, "") else None,
+        "town": (row.get("town") or "").strip(),
+        "aliases": aliases,
+    }
+
+
+def parse_feature(feature: dict):
+    lon, lat = feature["geometry"]["coordinates"][:2]
+    return parse_place({**feature["properties"], "lon": lon, "lat": lat})
+
+
+def load_gazetteer(path: str = GAZETTEER_PATH):
+    if not path or not os.path.exists(path):
+        return Gazetteer([])
+    if path.lower().endswith((".geojson", ".json")):
+        with open(path, encoding="utf-8") as f:
+            features = json.load(f)["features"]
+        rows = [feature for feature in features if (feature.get("geometry") or {}).get("type") == "Point"]
+        to_place = parse_feature
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        to_place = parse_place
+    places = []
+    for number, row in enumerate(rows, start=1):
+        # එක නරක row එකක් (හිස් lat වගේ) නිසා මුළු gazetteer එකම නැති නොවෙන්න skip කරනවා
+        try:
+            places.append(to_place(row))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            logger.warning("Skipping gazetteer row %d in %s: %r", number, path, e)
+    return Gazetteer(places)
@@ -1,35 +1,128 @@
 import os
-from langchain_community.document_loaders import PyPDFDirectoryLoader
+import sys
+import json
+import hashlib
+from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings 
 from dotenv import load_dotenv
+from vector_index import INDEX_DIR, export_index
+from embedding_service import get_embeddings
 
 load_dotenv()
 
-def ingest_docs():
+DATA_DIR = "./Data"
+CHROMA_DIR = "./chroma_db"
+# හැම file එකකම hash එක සහ ඒකේ chunk ids මෙතන තියාගන්නවා
+MANIFEST_PATH = os.path.join(CHROMA_DIR, "ingest_manifest.json")
+
+def file_sha256(path: str):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(path: str = MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {"files": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(manifest: dict, path: str = MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def chunk_ids(source: str, chunks):
+    # Deterministic ids: එකම content එකට හැම run එකකම එකම id එක (rerun idempotent)
+    ids, seen = [], {}
+    for chunk in chunks:
+        page = chunk.metadata.get("page", 0)
+        content_hash = hashlib.sha256(chunk.page_content.encode("utf-8")).hexdigest()
+        base = hashlib.sha256(f"{source}|{page}|{content_hash}".encode("utf-8")).hexdigest()[:32]
+        # එකම page එකේ එකම text එක දෙපාරක් තිබ්බොත් duplicate id නොවෙන්න
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+        ids.append(base if occurrence == 0 else f"{base}-{occurrence}")
+    return ids
+
+# embeddings / directories override කරන්න පුළුවන් (benchmarks offline run කරන්න)
+def ingest_docs(full: bool = False, export: bool = False, embeddings=None,
+                data_dir: str = DATA_DIR, chroma_dir: str = CHROMA_DIR, index_dir: str = INDEX_DIR):
     print("Loading PDFs...")
-    
-    loader = PyPDFDirectoryLoader("./Data") 
-    documents = loader.load()
-    print(f"Loaded {len(documents)} pages.")
+    pdf_files = sorted(
+        os.path.join(data_dir, name) for name in os.listdir(data_dir) if name.lower().endswith(".pdf")
+    )
+
+    if embeddings is None:
+        print("Creating Embeddings (Downloding model)...")
+        embeddings = get_embeddings()
+    db = Chroma(persist_directory=chroma_dir, embedding_function=embeddings)
+
+    manifest_path = os.path.join(chroma_dir, "ingest_manifest.json")
+    manifest = load_manifest(manifest_path)
+    if not os.path.exists(manifest_path) and db.get(limit=1, include=[])["ids"]:
+        # Manifest එකක් නැති පරණ DB එකක random ids තියෙන නිසා rebuild කරන්න ඕනේ
+        print("No manifest found for existing index, doing a full rebuild...")
+        full = True
+    if full:
+        # සම්පූර්ණ rebuild: පරණ vectors ඔක්කොම අයින් කරලා මුල ඉඳන්
+        db.delete_collection()
+        db = Chroma(persist_directory=chroma_dir, embedding_function=embeddings)
+        manifest = {"files": {}}
 
-    print("Splitting text...")
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    chunks = text_splitter.split_documents(documents)
-    print(f"Created {len(chunks)} text chunks.")
-
-    
-    print("Creating Embeddings (Downloding model)...")
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-
-    print("Saving to ChromaDB...")
-    db = Chroma.from_documents(
-        chunks, 
-        embeddings, 
-        persist_directory="./chroma_db"
-    )
-    print("Data ingestion complete!")
+    old_files = manifest["files"]
+    new_files = {}
+    added = removed = 0
+
+    for path in pdf_files:
+        source = os.path.relpath(path, data_dir)
+        sha = file_sha256(path)
+        previous = old_files.get(source)
+        if previous and previous["sha256"] == sha:
+            new_files[source] = previous  # වෙනසක් නැහැ, skip
+            continue
+
+        print(f"Splitting text... ({source})")
+        documents = PyPDFLoader(path).load()
+        chunks = text_splitter.split_documents(documents)
+        ids = chunk_ids(source, chunks)
+
+        # වෙනස් වුණු file එකක: අලුත් chunks විතරක් embed කරනවා, නැති වුණු ඒවා delete කරනවා
+        old_ids = set(previous["chunks"]) if previous else set()
+        stale_ids = list(old_ids - set(ids))
+        fresh = [(chunk_id, chunk) for chunk_id, chunk in zip(ids, chunks) if chunk_id not in old_ids]
+        if stale_ids:
+            db.delete(ids=stale_ids)
+        if fresh:
+            db.add_documents([chunk for _, chunk in fresh], ids=[chunk_id for chunk_id, _ in fresh])
+        added += len(fresh)
+        removed += len(stale_ids)
+        new_files[source] = {"sha256": sha, "chunks": ids}
+        print(f"{source}: {len(documents)} pages, {len(chunks)} chunks ({len(fresh)} new, {len(stale_ids)} removed).")
+
+    # ./Data එකෙන් අයින් කරපු files වල vectors delete කරනවා
+    for source, previous in old_files.items():
+        if source not in new_files and previous["chunks"]:
+            db.delete(ids=previous["chunks"])
+            removed += len(previous["chunks"])
+            print(f"{source}: removed from index.")
+
+    manifest["files"] = new_files
+    save_manifest(manifest, manifest_path)
+    print(f"Data ingestion complete! ({added} chunks embedded, {removed} removed)")
+
+    if export:
+        # Memory-mapped compact index එක (RETRIEVER_BACKEND=mmap) Chroma එකේ vectors වලින්ම හදනවා
+        dtype = os.getenv("VECTOR_INDEX_DTYPE", "float16")
+        count = export_index(db, index_dir, dtype=dtype)
+        print(f"Exported {count} vectors ({dtype}) to {index_dir}")
 
 if __name__ == "__main__":
-    ingest_docs()
\ No newline at end of file
+    # python ingest_data.py --full  -> සම්පූර්ණ rebuild එකක්
+    # python ingest_data.py --export-index  -> ./vector_index එකත් හදනවා
+    ingest_docs(full="--full" in sys.argv, export="--export-index" in sys.argv)
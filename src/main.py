@@ -1,53 +1,210 @@
 import os
-from fastapi import FastAPI, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import math
+import logging
+from datetime import datetime
+from contextlib import AsyncExitStack, asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import String, and_, cast, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
 
 # --- නිවැරදි Imports ---
-from database import engine, Base, get_db
+from database import engine, get_db, SessionLocal, open_checkpointer, create_tables, warmup_pool, check_db
 import models
 import auth
-from agent import tourism_agent  # තිත නැතිව Import කිරීම
+from chatlog_writer import ChatLogWriter
+from admission import AdmissionController, AdmissionRejected
+from agent import (  # තිත නැතිව Import කිරීම
+    build_agent, warmup as warmup_agent, load_places_cache, get_http_client, close_http_client,
+    weather_cache, places_cache, tool_flight, get_gazetteer, DeadlineExceeded, close_pending_tool_calls,
+)
+import metrics
 
 from pydantic import BaseModel
-from typing import List
-from langchain_core.messages import HumanMessage, AIMessage
+from typing import Optional
 
 # 1. Environment Variables
 load_dotenv()
 
-# 2. Database Tables
-models.Base.metadata.create_all(bind=engine)
+logger = logging.getLogger("tourism_api")
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+
+# ChatLog rows response path එකෙන් පිට, batches විදිහට DB එකට ලියනවා
+chatlog_writer = ChatLogWriter(
+    SessionLocal,
+    batch_size=int(os.getenv("CHATLOG_BATCH_SIZE", "50")),
+    flush_interval=float(os.getenv("CHATLOG_FLUSH_INTERVAL", "0.5")),
+    max_buffer=int(os.getenv("CHATLOG_MAX_BUFFER", "10000")),
+    spill_path=os.getenv("CHATLOG_SPILL_PATH", "./chatlog_spill.jsonl"),
+    dead_letter_path=os.getenv("CHATLOG_DEAD_LETTER_PATH", "./chatlog_dead_letter.jsonl"),
+)
+
+# Peak load එකේදී Groq / tools rate limits වලට නොවදින්න agent runs ගණන සීමා කරනවා
+admission = AdmissionController(
+    max_concurrent=int(os.getenv("CHAT_MAX_CONCURRENCY", "32")),
+    max_queue=int(os.getenv("CHAT_MAX_QUEUE", "64")),
+    queue_timeout=float(os.getenv("CHAT_QUEUE_TIMEOUT", "5")),
+    deadline=float(os.getenv("CHAT_DEADLINE_SECONDS", "45")),
+    rate_per_minute=float(os.getenv("USER_CHAT_RATE_PER_MINUTE", "20")),
+    burst=int(os.getenv("USER_CHAT_BURST", "5")),
+)
+
+# 2. Startup: DB tables, checkpointer, agent graph (import වෙද්දී නෙවෙයි)
+async def init_backend(app: FastAPI):
+    # Postgres down වුණත් worker එක start වෙනවා; ready වෙනකම් backoff එක්ක retry කරනවා
+    delay = 1
+    while True:
+        try:
+            await create_tables()
+            if app.state.tourism_agent is None:
+                checkpointer = await app.state.exit_stack.enter_async_context(open_checkpointer())
+                app.state.tourism_agent = build_agent(checkpointer)
+        except Exception as e:
+            app.state.startup_error = str(e)
+            logger.warning("Backend init failed (%s), retrying in %ss", e, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+            continue
+
+        await run_in_threadpool(load_places_cache)
+        # Gazetteer index එක event loop එකෙන් පිට හදනවා (පළමු find_place එක block නොවෙන්න)
+        gazetteer = await run_in_threadpool(get_gazetteer)
+        logger.info("Gazetteer loaded: %s places", len(gazetteer))
+        if WARMUP_ON_STARTUP:
+            # Warmup අසාර්ථක වුණත් ready වෙනවා; clients පළමු request එකේදී lazy හැදෙනවා
+            try:
+                get_http_client()
+                await run_in_threadpool(warmup_agent)
+                await warmup_pool()
+            except Exception as e:
+                logger.warning("Warmup failed: %s", e)
+        app.state.startup_error = None
+        app.state.ready = True
+        logger.info("Backend ready")
+        return
 
 # 3. App Setup
-app = FastAPI(title="Smart Tourism API 🇱🇰")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    app.state.startup_error = None
+    app.state.tourism_agent = None
+    auth.start_hash_pool()
+    await chatlog_writer.start()
+    async with AsyncExitStack() as exit_stack:
+        app.state.exit_stack = exit_stack
+        init_task = asyncio.create_task(init_backend(app))
+        yield
+        init_task.cancel()
+        app.state.ready = False
+        await chatlog_writer.stop()
+    # Shutdown වෙද්දී pooled HTTP connections, DB pool සහ hashing pool එක වහනවා
+    await close_http_client()
+    await engine.dispose()
+    auth.shutdown_hash_pool()
+
+app = FastAPI(title="Smart Tourism API 🇱🇰", lifespan=lifespan)
+
+# --- Request timing + (optional) per-request trace log ---
+app.add_middleware(metrics.RequestMetricsMiddleware)
+
+@app.get("/metrics")
+def get_metrics():
+    body, content_type = metrics.render_metrics()
+    return Response(content=body, media_type=content_type)
+
+def get_agent():
+    if not app.state.ready:
+        raise HTTPException(status_code=503, detail="Service is starting up")
+    return app.state.tourism_agent
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Smart Tourism API"}
 
+# --- Liveness / Readiness ---
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    if not app.state.ready:
+        raise HTTPException(status_code=503, detail=app.state.startup_error or "Starting up")
+    try:
+        await check_db()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {e}")
+    return {"status": "ready"}
+
+# --- Cache & Tool Stats (API quota එක සහ slow upstream බලාගන්න) ---
+@app.get("/stats")
+def get_stats():
+    return {
+        "weather_cache": weather_cache.stats(),
+        "places_cache": places_cache.stats(),
+        "gazetteer_places": len(get_gazetteer()),
+        "tool_singleflight": tool_flight.stats(),
+        "chatlog_writer": chatlog_writer.stats(),
+        "admission": admission.stats(),
+    }
+
+# --- Password hashing pool එක full නම් ඉක්මනින් reject කරනවා ---
+@app.exception_handler(auth.PasswordHasherBusy)
+async def password_hasher_busy_handler(request, exc):
+    return JSONResponse(status_code=503, content={"detail": "Too many login requests, try again"}, headers={"Retry-After": "1"})
+
+# --- /chat admission: rate limit -> 429, queue එක full -> 503 (Retry-After එක්ක) ---
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request, exc):
+    return JSONResponse(
+        status_code=exc.status_code, content={"detail": exc.detail},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    with metrics.observe_db("get_user"):
+        result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
+
 # --- Signup ---
 @app.post("/signup")
-def signup(username: str, email: str, password: str, db: Session = Depends(get_db)):
-    user_exists = db.query(models.User).filter(models.User.email == email).first()
+async def signup(username: str, email: str, password: str, db: AsyncSession = Depends(get_db)):
+    user_exists = await get_user_by_email(db, email)
     if user_exists:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_pwd = auth.hash_password(password)
+    # bcrypt එක process pool එකේ (threadpool එක block වෙන්නේ නැහැ)
+    hashed_pwd = await auth.hash_password_async(password)
     new_user = models.User(username=username, email=email, password=hashed_pwd)
     
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    with metrics.observe_db("create_user"):
+        db.add(new_user)
+        await db.commit()
+        await db.refresh(new_user)
     return {"message": "User created successfully", "user_id": new_user.id}
 
 # --- Login ---
 @app.post("/login")
-def login(email: str, password: str, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if not user or not auth.verify_password(password, user.password):
+async def login(email: str, password: str, db: AsyncSession = Depends(get_db)):
+    user = await get_user_by_email(db, email)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await auth.verify_and_update_async(password, user.password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # BCRYPT_ROUNDS වෙනස් කරලා නම් අලුත් cost එකට rehash කරලා save කරනවා
+        user.password = new_hash
+        await db.commit()
     
     access_token = auth.create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
@@ -56,47 +213,292 @@ def login(email: str, password: str, db: Session = Depends(get_db)):
 class ChatRequest(BaseModel):
     user_query: str
     user_id: int
-    history: List[dict] = []  # කලින් කතා කළ දේවල් මෙතනට එනවා
+    thread_id: Optional[str] = None  # කලින් conversation එක server එකේ තියෙනවා; අලුත් එකකට None
+
+def build_agent_run(request: ChatRequest, deadline: float):
+    # History එක checkpointer එකේ තියෙන නිසා අලුත් ප්‍රශ්නය විතරක් යවනවා
+    thread_id = request.thread_id or uuid.uuid4().hex
+    # iterations = 0: හැම turn එකකටම agent loop limit එක අලුතින් පටන් ගන්නවා
+    inputs = {"messages": [HumanMessage(content=request.user_query)], "iterations": 0}
+    # වෙන user කෙනෙක්ගේ thread එකකට යන්න බැරි වෙන්න user_id එකත් key එකට දානවා
+    # deadline එක agent loop එකට සහ tool timeouts වලට යනවා
+    config = {"configurable": {"thread_id": f"{request.user_id}:{thread_id}", "deadline": deadline}}
+    return thread_id, inputs, config
+
+async def repair_thread(tourism_agent, config: dict):
+    # Cancel වුණ run එකක් thread එක අතරමග (tool_calls එකකට උත්තර නැතුව) තියලා ගියොත් හදනවා
+    try:
+        await close_pending_tool_calls(tourism_agent, config)
+    except Exception as e:
+        logger.warning("Could not repair thread %s: %s", config["configurable"]["thread_id"], e)
 
 # --- 3. AI Chat (Context සමඟ) ---
 @app.post("/chat")
-async def chat_with_ai(request: ChatRequest, db: Session = Depends(get_db)):
-    # 1. Frontend එකෙන් එන History එක LangChain format එකට හරවමු
-    formatted_history = []
-    
-    for msg in request.history:
-        if msg['role'] == "user":
-            formatted_history.append(HumanMessage(content=msg['content']))
-        elif msg['role'] == "assistant":
-            formatted_history.append(AIMessage(content=msg['content']))
-    
-    # 2. අලුත් ප්‍රශ්නය අන්තිමට එකතු කරන්න
-    formatted_history.append(HumanMessage(content=request.user_query))
-    
-    # 3. Agent ට සම්පූර්ණ History එකම යවමු
-    inputs = {"messages": formatted_history}
-    result = tourism_agent.invoke(inputs)
+async def chat_with_ai(request: ChatRequest):
+    tourism_agent = get_agent()
+    async with admission.slot(request.user_id) as deadline:
+        thread_id, inputs, config = build_agent_run(request, deadline)
+        try:
+            # Deadline එක ඉවර වුණොත් run එක cancel වෙනවා (in-flight LLM / tool calls එක්කම)
+            result = await asyncio.wait_for(
+                tourism_agent.ainvoke(inputs, config=config), timeout=deadline - time.monotonic()
+            )
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            metrics.DEADLINE_EXCEEDED.inc()
+            await repair_thread(tourism_agent, config)
+            raise HTTPException(status_code=504, detail="The assistant took too long, please try again")
     
     # AI එකේ අන්තිම උත්තරය ගන්න
     ai_response = result["messages"][-1].content
 
     # 4. Database එකේ සේව් කිරීම
-    new_log = models.ChatLog(
-        user_id=request.user_id, 
-        query=request.user_query, 
-        response=ai_response
-    )
-    db.add(new_log)
-    db.commit()
+    chatlog_writer.submit(request.user_id, thread_id, request.user_query, ai_response)
 
     return {
         "user_query": request.user_query,
         "ai_response": ai_response,
+        "thread_id": thread_id,
         "status": "Processed by LangGraph Agent"
     }
 
+def format_sse(event: str, data: dict):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+class SlotStreamingResponse(StreamingResponse):
+    # Generator එක පටන් ගන්න කලින් response එක cancel / disconnect වුණත් admission slot එක නිදහස් කරනවා
+    def __init__(self, content, release, **kwargs):
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+
+# --- 4. AI Chat Streaming (Server-Sent Events) ---
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    tourism_agent = get_agent()
+    # Slot එක stream එක ඉවර වෙනකම් (හෝ client එක disconnect වෙනකම්) තියාගන්නවා
+    deadline = await admission.acquire(request.user_id)
+    release = admission.releaser()
+    thread_id, inputs, config = build_agent_run(request, deadline)
+
+    async def event_generator():
+        answer_parts = []
+        try:
+            async for event in tourism_agent.astream_events(inputs, config=config, version="v2"):
+                kind = event["event"]
+                if kind == "on_chat_model_start":
+                    # අලුත් LLM call එකක් පටන් ගත්තොත් අන්තිම උත්තරය විතරක් තියාගන්න;
+                    # කලින් call එකේ text client එකට ගිහින් නම් ඒකත් මකන්න කියනවා (ChatLog එකට සමානව)
+                    if answer_parts:
+                        yield format_sse("reset", {})
+                    answer_parts = []
+                elif kind == "on_chat_model_stream":
+                    content = event["data"]["chunk"].content
+                    if content:
+                        answer_parts.append(content)
+                        yield format_sse("token", {"content": content})
+                elif kind == "on_chat_model_end" and not answer_parts:
+                    # Stream නොකරන models වලට: සම්පූර්ණ උත්තරය එක token එකක් විදිහට
+                    content = event["data"]["output"].content
+                    if content:
+                        answer_parts.append(content)
+                        yield format_sse("token", {"content": content})
+                elif kind == "on_tool_start":
+                    yield format_sse("tool_start", {"tool": event["name"], "input": event["data"].get("input")})
+                elif kind == "on_tool_end":
+                    yield format_sse("tool_end", {"tool": event["name"]})
+        except DeadlineExceeded:
+            metrics.DEADLINE_EXCEEDED.inc()
+            await repair_thread(tourism_agent, config)
+            yield format_sse("error", {"detail": "The assistant took too long, please try again"})
+            return
+        except asyncio.CancelledError:
+            # Client එක disconnect වුණා: response එක ඕන නැහැ, thread එක විතරක් හදනවා
+            await asyncio.shield(repair_thread(tourism_agent, config))
+            raise
+        except Exception as e:
+            await repair_thread(tourism_agent, config)
+            yield format_sse("error", {"detail": str(e)})
+            return
+        finally:
+            # Agent run එක ඉවර වුණ ගමන් slot එක නිදහස් (done event එක යවන්න කලින්)
+            release()
+
+        ai_response = "".join(answer_parts)
+        # Stream එක ඉවර වුණාම Database එකේ සේව් කිරීම
+        chatlog_writer.submit(request.user_id, thread_id, request.user_query, ai_response)
+        yield format_sse("done", {"ai_response": ai_response, "thread_id": thread_id})
+
+    return SlotStreamingResponse(
+        event_generator(),
+        release,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # --- History ---
+HISTORY_PREVIEW_CHARS = 60
+
+def encode_cursor(timestamp: datetime, chat_id: int):
+    return f"{timestamp.isoformat()}_{chat_id}"
+
+def decode_cursor(cursor: str):
+    timestamp, _, chat_id = cursor.rpartition("_")
+    return datetime.fromisoformat(timestamp), int(chat_id)
+
+async def history_etag(db: AsyncSession, user_id: int, limit: int, cursor: Optional[str], view: str = "turns"):
+    # ChatLog rows append-only නිසා count + max(id) වෙනස් නොවුනොත් history එකත් වෙනස් වෙලා නැහැ
+    with metrics.observe_db("history_etag"):
+        result = await db.execute(
+            select(func.count(models.ChatLog.id), func.max(models.ChatLog.id))
+            .where(models.ChatLog.user_id == user_id)
+        )
+    count, max_id = result.one()
+    digest = hashlib.sha1(f"{view}:{user_id}:{count}:{max_id}:{limit}:{cursor}".encode()).hexdigest()[:16]
+    return f'W/"{digest}"'
+
 @app.get("/history/{user_id}")
-def get_chat_history(user_id: int, db: Session = Depends(get_db)):
-    history = db.query(models.ChatLog).filter(models.ChatLog.user_id == user_id).all()
-    return history
\ No newline at end of file
+async def get_chat_history(
+    user_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    # Streamlit rerun එකකදී history වෙනස් වෙලා නැත්නම් 304 එකක් විතරයි (payload නැහැ)
+    etag = await history_etag(db, user_id, limit, cursor)
+    if etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    # Sidebar එකට ඕන summary එක විතරයි (id, කෙටි query එක, timestamp)
+    q = select(
+        models.ChatLog.id,
+        func.substr(models.ChatLog.query, 1, HISTORY_PREVIEW_CHARS).label("query"),
+        models.ChatLog.timestamp,
+    ).where(models.ChatLog.user_id == user_id)
+
+    # Keyset pagination: කලින් page එකේ අන්තිම row එකට වඩා පරණ ඒවා
+    if cursor:
+        try:
+            cursor_ts, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        q = q.where(or_(
+            models.ChatLog.timestamp < cursor_ts,
+            and_(models.ChatLog.timestamp == cursor_ts, models.ChatLog.id < cursor_id),
+        ))
+
+    with metrics.observe_db("history_page"):
+        result = await db.execute(
+            q.order_by(models.ChatLog.timestamp.desc(), models.ChatLog.id.desc()).limit(limit + 1)
+        )
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [{"id": r.id, "query": r.query, "timestamp": r.timestamp} for r in rows],
+        "next_cursor": encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None,
+    }
+
+def decode_thread_cursor(cursor: str):
+    # isoformat එකේ "_" නැති නිසා පළමු "_" එකෙන් වෙන් කරනවා (thread_id එකේ "_" තිබුණත්)
+    timestamp, _, key = cursor.partition("_")
+    if not key:
+        raise ValueError("missing thread key")
+    return datetime.fromisoformat(timestamp), key
+
+@app.get("/history/{user_id}/threads")
+async def get_thread_history(
+    user_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    # Sidebar එකට conversation (thread) එකකට එක item එකක්: පළමු ප්‍රශ්නය, turns ගණන, අන්තිම වෙලාව
+    etag = await history_etag(db, user_id, limit, cursor, view="threads")
+    if etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    # thread_id නැති පරණ rows (migration එකට කලින්) තනි turn එකක conversations විදිහට
+    key = func.coalesce(models.ChatLog.thread_id, cast(models.ChatLog.id, String))
+    threads = (
+        select(
+            key.label("key"),
+            func.min(models.ChatLog.id).label("first_id"),
+            func.max(models.ChatLog.timestamp).label("last_timestamp"),
+            func.count(models.ChatLog.id).label("turns"),
+        )
+        .where(models.ChatLog.user_id == user_id)
+        .group_by(key)
+        .subquery()
+    )
+    q = select(
+        threads.c.key,
+        threads.c.last_timestamp,
+        threads.c.turns,
+        models.ChatLog.id,
+        models.ChatLog.thread_id,
+        func.substr(models.ChatLog.query, 1, HISTORY_PREVIEW_CHARS).label("query"),
+    ).join(models.ChatLog, models.ChatLog.id == threads.c.first_id)
+
+    if cursor:
+        try:
+            cursor_ts, cursor_key = decode_thread_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        q = q.where(or_(
+            threads.c.last_timestamp < cursor_ts,
+            and_(threads.c.last_timestamp == cursor_ts, threads.c.key < cursor_key),
+        ))
+
+    with metrics.observe_db("history_threads_page"):
+        result = await db.execute(
+            q.order_by(threads.c.last_timestamp.desc(), threads.c.key.desc()).limit(limit + 1)
+        )
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [
+            {"thread_id": r.thread_id, "chat_id": r.id, "query": r.query, "turns": r.turns,
+             "last_timestamp": r.last_timestamp}
+            for r in rows
+        ],
+        "next_cursor": f"{rows[-1].last_timestamp.isoformat()}_{rows[-1].key}" if has_more else None,
+    }
+
+@app.get("/history/{user_id}/threads/{thread_id}")
+async def get_thread(user_id: int, thread_id: str, db: AsyncSession = Depends(get_db)):
+    # Agent එක පාවිච්චි කරන context එකම screen එකේ පෙන්වන්න thread එකේ turns ඔක්කොම පිළිවෙළට
+    with metrics.observe_db("history_thread"):
+        result = await db.execute(
+            select(models.ChatLog.id, models.ChatLog.query, models.ChatLog.response, models.ChatLog.timestamp)
+            .where(models.ChatLog.user_id == user_id, models.ChatLog.thread_id == thread_id)
+            .order_by(models.ChatLog.timestamp, models.ChatLog.id)
+        )
+    turns = result.all()
+    if not turns:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return {
+        "thread_id": thread_id,
+        "turns": [{"id": t.id, "query": t.query, "response": t.response, "timestamp": t.timestamp} for t in turns],
+    }
+
+@app.get("/history/{user_id}/{chat_id}")
+async def get_chat(user_id: int, chat_id: int, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(models.ChatLog).where(
+        models.ChatLog.id == chat_id, models.ChatLog.user_id == user_id
+    ))
+    chat = result.scalars().first()
+    if not chat:
+        raise HTTPException(status_code=404, detail="Chat not found")
+    return chat
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# /chat එක slow නම් කොතනද කාලය යන්නේ කියලා බලන්න: request, LangGraph nodes, tools, LLM tokens, DB.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_LATENCY = Histogram(
+    "tourism_http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+NODE_LATENCY = Histogram(
+    "tourism_agent_node_duration_seconds", "LangGraph node latency", ["node"], buckets=LATENCY_BUCKETS,
+)
+NODE_ERRORS = Counter("tourism_agent_node_errors_total", "LangGraph node failures", ["node"])
+TOOL_LATENCY = Histogram(
+    "tourism_tool_duration_seconds", "Tool call latency", ["tool"], buckets=LATENCY_BUCKETS,
+)
+TOOL_CALLS = Counter("tourism_tool_calls_total", "Tool calls by outcome (ok / error / timeout)", ["tool", "outcome"])
+PLACE_LOOKUPS = Counter(
+    "tourism_place_lookups_total", "find_place answers by source (gazetteer / cache / google)", ["source"],
+)
+TOOL_COALESCED = Counter(
+    "tourism_tool_coalesced_total", "Tool calls served by an identical in-flight call (single-flight)", ["tool"],
+)
+AGENT_ITERATIONS = Histogram(
+    "tourism_agent_iterations", "Agent <-> tools loop iterations per turn", buckets=(1, 2, 3, 4, 5, 6, 8, 10),
+)
+LLM_TOKENS = Counter("tourism_llm_tokens_total", "LLM tokens used", ["kind"])
+PROMPT_TOKENS = Histogram(
+    "tourism_agent_prompt_tokens", "Approximate prompt tokens per LLM call after context compaction",
+    buckets=(250, 500, 1000, 2000, 3000, 4000, 6000, 8000, 16000),
+)
+AGENT_ACTIVE = Gauge("tourism_agent_runs_active", "Agent runs currently admitted")
+AGENT_QUEUED = Gauge("tourism_agent_runs_queued", "Agent runs waiting for a slot")
+ADMISSION_REJECTIONS = Counter(
+    "tourism_admission_rejections_total", "Chat requests rejected (rate_limited / queue_full / queue_timeout)", ["reason"],
+)
+DEADLINE_EXCEEDED = Counter("tourism_chat_deadline_exceeded_total", "Agent runs stopped by their request deadline")
+DB_LATENCY = Histogram(
+    "tourism_db_operation_duration_seconds", "Database operation latency", ["operation"], buckets=LATENCY_BUCKETS,
+)
+
+# --- Per-request trace (TRACE_LOGS=1 නම් request එකකට JSON log line එකක්) ---
+TRACE_LOGS = os.getenv("TRACE_LOGS", "0") == "1"
+trace_logger = logging.getLogger("tourism_api.trace")
+_current_trace = ContextVar("current_trace", default=None)
+
+
+def start_trace(request_id: str):
+    trace = {"request_id": request_id, "spans": []}
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token):
+    _current_trace.reset(token)
+
+
+def log_trace(trace, **fields):
+    if TRACE_LOGS:
+        trace_logger.info(json.dumps({**trace, **fields}, default=str))
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI request timing + trace: stops on the last response body chunk, so streams are timed in full."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1") or uuid.uuid4().hex
+        trace, token = start_trace(request_id)
+        start = time.perf_counter()
+        status_code = 500
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            elapsed = time.perf_counter() - start
+            # Route template එක label එකට (/history/{user_id}) - cardinality අඩු කරන්න
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_LATENCY.labels(scope["method"], route, status_code).observe(elapsed)
+            log_trace(trace, method=scope["method"], route=route, status=status_code, ms=round(elapsed * 1000, 2))
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", request_id.encode())]}
+            await send(message)
+            # StreamingResponse එකේ අන්තිම chunk එක (more_body=False) යවපු වෙලාවට තමයි request එක ඉවර
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish()  # Exception / client disconnect
+            end_trace(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    # Trace එකක් ඇතුලේ නම් duration එක record කරනවා (gather කරපු tasks වලිනුත් එකම trace එකට)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace = _current_trace.get()
+        if trace is not None:
+            trace["spans"].append({"name": name, "ms": round((time.perf_counter() - start) * 1000, 2), **attributes})
+
+
+@contextmanager
+def observe_node(node: str):
+    start = time.perf_counter()
+    try:
+        with span(f"node:{node}"):
+            yield
+    except Exception:
+        NODE_ERRORS.labels(node).inc()
+        raise
+    finally:
+        NODE_LATENCY.labels(node).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def observe_db(operation: str):
+    start = time.perf_counter()
+    try:
+        with span(f"db:{operation}"):
+            yield
+    finally:
+        DB_LATENCY.labels(operation).observe(time.perf_counter() - start)
+
+
+def record_tool(tool: str, elapsed: float, outcome: str):
+    TOOL_LATENCY.labels(tool).observe(elapsed)
+    TOOL_CALLS.labels(tool, outcome).inc()
+    trace = _current_trace.get()
+    if trace is not None:
+        trace["spans"].append({"name": f"tool:{tool}", "ms": round(elapsed * 1000, 2), "outcome": outcome})
+
+
+def record_llm_usage(message):
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage.get("input_tokens"):
+        LLM_TOKENS.labels("prompt").inc(usage["input_tokens"])
+    if usage.get("output_tokens"):
+        LLM_TOKENS.labels("completion").inc(usage["output_tokens"])
+
+
+def render_metrics():
+    return generate_latest(), CONTENT_TYPE_LATEST
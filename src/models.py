@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
 import datetime
@@ -14,6 +14,12 @@ class ChatLog(Base):
     __tablename__ = "chat_logs"
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
+    thread_id = Column(String, index=True)
     query = Column(Text)
     response = Column(Text)
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+
+    # History pagination එකට (user_id, timestamp) composite index එක
+    __table_args__ = (
+        Index("ix_chat_logs_user_id_timestamp", "user_id", "timestamp"),
+    )
@@ -0,0 +1,54 @@
+import os
+import re
+import sys
+import time
+import asyncio
+import subprocess
+
+# Worker startup එක මනින්න:
+#   1. `import main` එකට යන කාලය සහ බරම modules (python -X importtime)
+#   2. lifespan startup එක /readyz ready වෙනකම් යන කාලය
+#   python profile_startup.py [top_n]
+
+TOP_N = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def profile_imports():
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=HERE, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        raise SystemExit("import main failed")
+
+    # "import time: self [us] | cumulative | imported package"
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            rows.append((int(match.group(2)), len(match.group(3)), match.group(4)))
+    top_level = [row for row in rows if row[1] == 1]
+    print(f"import main: {wall_ms:.0f} ms wall (interpreter start included)")
+    print(f"Top {TOP_N} top-level imports by cumulative time:")
+    for cumulative_us, _, name in sorted(top_level, reverse=True)[:TOP_N]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+async def profile_lifespan():
+    sys.path.insert(0, HERE)
+    import main
+
+    start = time.perf_counter()
+    async with main.lifespan(main.app):
+        while not main.app.state.ready:
+            await asyncio.sleep(0.01)
+        print(f"lifespan startup until ready: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    profile_imports()
+    asyncio.run(profile_lifespan())
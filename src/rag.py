@@ -0,0 +1,86 @@
+import os
+from functools import lru_cache
+from langchain_community.vectorstores import Chroma
+
+from ingest_data import CHROMA_DIR
+from embedding_service import get_embeddings
+from semantic_cache import SemanticCache, CachedQAChain
+from vector_index import INDEX_DIR, MmapVectorIndex, MmapRetriever
+
+# app.py සහ test_chat.py දෙකම පාවිච්චි කරන RAG setup එක
+# RETRIEVER_BACKEND=mmap -> ingest_data.py --export-index එකෙන් හදපු memory-mapped index එක
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "chroma")
+# FastAPI agent එකේ search_travel_guides tool එකට
+RAG_TOOL_K = int(os.getenv("RAG_TOOL_K", "3"))
+RAG_SCORE_THRESHOLD = float(os.getenv("RAG_SCORE_THRESHOLD", "0.35"))  # cosine similarity
+
+def load_embeddings():
+    # Process එකේ shared (batched + cached) embeddings; EMBEDDING_SERVICE_URL තියෙනවා නම් local service එක
+    return get_embeddings()
+
+def load_vector_store(embeddings):
+    return Chroma(persist_directory=CHROMA_DIR, embedding_function=embeddings)
+
+def load_retriever(embeddings, k: int = 3):
+    if RETRIEVER_BACKEND == "mmap":
+        return MmapRetriever(index=MmapVectorIndex(INDEX_DIR), embeddings=embeddings, k=k)
+    return load_vector_store(embeddings).as_retriever(search_kwargs={"k": k})
+
+class GuideSearch:
+    """Process-wide guide retriever returning (Document, cosine score) pairs above a threshold."""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.index = self.store = None
+        if RETRIEVER_BACKEND == "mmap":
+            self.index = MmapVectorIndex(INDEX_DIR)
+        elif os.path.exists(CHROMA_DIR):
+            self.store = load_vector_store(embeddings)
+
+    def search(self, query: str, k: int = RAG_TOOL_K, score_threshold: float = RAG_SCORE_THRESHOLD):
+        if self.index is None and self.store is None:
+            return []
+        vector = self.embeddings.embed_query(query)
+        if self.index is not None:
+            pairs = self.index.search(vector, k)
+        else:
+            # Chroma එකේ default distance එක squared L2; MiniLM vectors unit length නිසා cosine = 1 - d / 2
+            pairs = [
+                (doc, 1 - distance / 2)
+                for doc, distance in self.store.similarity_search_by_vector_with_relevance_scores(vector, k=k)
+            ]
+        return [(doc, score) for doc, score in pairs if score >= score_threshold]
+
+@lru_cache(maxsize=None)
+def get_guide_search():
+    return GuideSearch(load_embeddings())
+
+def build_qa_chain():
+    from langchain_groq import ChatGroq
+    from langchain.chains import RetrievalQA
+
+    embeddings = load_embeddings()
+
+    # LLM Setup (Groq)
+    llm = ChatGroq(
+        model="llama-3.3-70b-versatile",
+        temperature=0.5,
+        api_key=os.getenv("GROQ_API_KEY")
+    )
+
+    # RAG Chain
+    qa_chain = RetrievalQA.from_chain_type(
+        llm=llm,
+        chain_type="stuff",
+        retriever=load_retriever(embeddings, k=3),
+        return_source_documents=True
+    )
+
+    # එකම වගේ ප්‍රශ්න වලට ("best time to visit Ella" / "when should I go to Ella") cache එකෙන් උත්තර
+    cache = SemanticCache(
+        embeddings,
+        threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+        ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+        maxsize=int(os.getenv("SEMANTIC_CACHE_SIZE", "500")),
+    )
+    return CachedQAChain(qa_chain, cache)
@@ -0,0 +1,98 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from ingest_data import MANIFEST_PATH
+
+
+class SemanticCache:
+    """Answer cache keyed by query embeddings; cleared when the vector store is re-ingested."""
+
+    def __init__(self, embeddings, threshold: float = 0.92, ttl: float = 3600, maxsize: int = 500,
+                 generation_file: str = MANIFEST_PATH):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.generation_file = generation_file
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # query -> (expires_at, unit vector, value)
+        self._generation = self._current_generation()
+        self._lock = threading.Lock()
+
+    def _current_generation(self):
+        try:
+            return os.path.getmtime(self.generation_file)
+        except OSError:
+            return None
+
+    def _embed(self, query: str):
+        vector = np.asarray(self.embeddings.embed_query(" ".join(query.split())), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def lookup(self, query: str):
+        # Miss එකක් වුණොත් ආයේ embed නොකර store කරන්න vector එකත් return කරනවා
+        vector = self._embed(query)
+        with self._lock:
+            generation = self._current_generation()
+            if generation != self._generation:
+                # Vector store එක re-ingest කරලා නම් පරණ උත්තර වලංගු නැහැ
+                self._entries.clear()
+                self._generation = generation
+
+            now = time.time()
+            for key in [k for k, (expires_at, _, _) in self._entries.items() if expires_at < now]:
+                del self._entries[key]
+
+            if self._entries:
+                keys = list(self._entries)
+                matrix = np.stack([self._entries[k][1] for k in keys])
+                scores = matrix @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._entries.move_to_end(keys[best])
+                    self.hits += 1
+                    return self._entries[keys[best]][2], vector
+            self.misses += 1
+            return None, vector
+
+    def store(self, query: str, vector, value):
+        with self._lock:
+            self._entries[query] = (time.time() + self.ttl, vector, value)
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+class CachedQAChain:
+    """Drop-in wrapper around a RetrievalQA chain that answers from a SemanticCache first."""
+
+    def __init__(self, chain, cache: SemanticCache):
+        self.chain = chain
+        self.cache = cache
+
+    def invoke(self, inputs: dict):
+        query = inputs["query"]
+        cached, vector = self.cache.lookup(query)
+        if cached is not None:
+            return {**cached, "query": query}
+        result = self.chain.invoke(inputs)
+        self.cache.store(query, vector, result)
+        return result
@@ -0,0 +1,56 @@
+import json
+import asyncio
+
+from cache import normalize_key
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight task and its result (or exception)."""
+
+    def __init__(self):
+        self._calls = {}  # key -> [asyncio.Task, waiters]
+        self.leaders = 0
+        self.shared = 0
+        self.cancelled = 0
+
+    def _done(self, key, task):
+        call = self._calls.get(key)
+        if call is not None and call[0] is task:
+            del self._calls[key]
+        # Waiters ඔක්කොම timeout වෙලා ගියත් "exception was never retrieved" warning එක නොඑන්න
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key, fn):
+        # returns (result, shared) - shared=True නම් වෙන කෙනෙක් පටන් ගත්ත call එකේ result එක
+        call = self._calls.get(key)
+        shared = call is not None
+        if shared:
+            self.shared += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            call = self._calls[key] = [task, 0]
+            task.add_done_callback(lambda t: self._done(key, t))
+        task = call[0]
+        call[1] += 1
+        try:
+            # එක waiter කෙනෙක් cancel/timeout වුණාට අනිත් අයගේ upstream call එක cancel වෙන්නේ නැහැ
+            return await asyncio.shield(task), shared
+        finally:
+            call[1] -= 1
+            if call[1] == 0 and not task.done():
+                # අන්තිම waiter එකත් ගියා: කාටවත් ඕන නැති upstream call එක නවත්තනවා
+                self.cancelled += 1
+                task.cancel()
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+
+    def stats(self):
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "shared": self.shared, "cancelled": self.cancelled}
+
+
+def args_key(args: dict):
+    # {"city": " Colombo"} සහ {"city": "colombo"} එකම upstream request එක
+    normalized = {k: normalize_key(v) if isinstance(v, str) else v for k, v in args.items()}
+    return json.dumps(normalized, sort_keys=True, default=str)
@@ -1,9 +1,7 @@
 import os
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain.chains import RetrievalQA
+from rag import build_qa_chain
+from ingest_data import CHROMA_DIR
 
 
 load_dotenv()
@@ -12,32 +10,12 @@ def start_chat():
     print("Initializing AI Agent...")
 
     
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-
-    
-    if not os.path.exists("./chroma_db"):
+    if not os.path.exists(CHROMA_DIR):
         print("Error: Database not found. Please run ingest_data.py first.")
         return
 
-    vector_db = Chroma(
-        persist_directory="./chroma_db",
-        embedding_function=embeddings
-    )
-
-    
-    llm = ChatGroq(
-        model="llama-3.3-70b-versatile",  
-        temperature=0.5,
-        api_key=os.getenv("GROQ_API_KEY")
-    )
-
     
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=vector_db.as_retriever(search_kwargs={"k": 3}),
-        return_source_documents=True
-    )
+    qa_chain = build_qa_chain()
 
     print("\n✅ AI Agent is Ready! (Type 'quit' to exit)\n")
 
@@ -46,6 +24,7 @@ def start_chat():
         query = input("You: ")
         
         if query.lower() in ["quit", "exit"]:
+            print(f"Answer cache: {qa_chain.cache.stats()}")
             break
         
         if query.strip() == "":
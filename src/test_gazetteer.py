@@ -0,0 +1,46 @@
+from gazetteer import Gazetteer, parse_place
+
+# Gazetteer.lookup: "<place name> in <town>" queries category search එකට කලින් name එකෙන් match වෙන්න
+#   python -m pytest test_gazetteer.py
+
+
+def place(name, category, lat, lon, town, rating=""):
+    return parse_place({"name": name, "category": category, "lat": lat, "lon": lon, "town": town,
+                        "address": f"{town}, Sri Lanka", "rating": rating})
+
+
+GAZETTEER = Gazetteer([
+    place("Kandy", "town", 7.2906, 80.6337, "Kandy"),
+    place("Galle", "town", 6.0535, 80.2210, "Galle"),
+    place("Temple of the Tooth", "temple", 7.2936, 80.6413, "Kandy", 4.8),
+    place("Gangaramaya Temple", "temple", 7.2920, 80.6350, "Kandy", 4.9),
+    place("Lankatilaka Temple", "temple", 7.2400, 80.5650, "Kandy", 4.6),
+    place("Galle Fort", "fort", 6.0260, 80.2170, "Galle", 4.8),
+    place("Lotus Hotel", "hotel", 7.2950, 80.6300, "Kandy", 4.2),
+    place("Old Rest House at Galle", "hotel", 6.0300, 80.2150, "Galle", 4.1),
+])
+
+
+def test_named_place_in_town_returns_that_place():
+    assert GAZETTEER.lookup("Temple of the Tooth in Kandy").startswith("Found: Temple of the Tooth,")
+    assert GAZETTEER.lookup("temple of tooth near kandy").startswith("Found: Temple of the Tooth,")
+    assert GAZETTEER.lookup("Galle Fort in Galle").startswith("Found: Galle Fort,")
+
+
+def test_named_place_outside_the_radius_is_not_returned_for_that_town():
+    # Galle Fort Kandy වල නැහැ: category / Google fallback එකට යනවා
+    answer = GAZETTEER.lookup("Galle Fort in Kandy")
+    assert answer is None or not answer.startswith("Found: Galle Fort,")
+
+
+def test_category_query_still_lists_nearby_places():
+    answer = GAZETTEER.lookup("temples in Kandy")
+    assert answer.startswith("Found near Kandy:")
+    assert "Gangaramaya Temple" in answer
+
+
+def test_name_match_runs_when_nothing_is_in_range():
+    # "at Galle" එකෙන් Galle anchor එක match වෙනවා, "rest hous" category එකට කිසිම දෙයක් නැහැ;
+    # ඊට පස්සෙත් සම්පූර්ණ query එක (typo එක්ක) place name එකක් විදිහට බලනවා
+    assert GAZETTEER.lookup("Old Rest Hous at Galle").startswith("Found: Old Rest House at Galle,")
+    assert GAZETTEER.lookup("museums near Kandy within 1 km") is None
@@ -0,0 +1,60 @@
+import json
+import asyncio
+import logging
+
+import httpx
+from prometheus_client import REGISTRY
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+import metrics
+
+# RequestMetricsMiddleware: streaming responses වල latency / trace එක අන්තිම chunk එක යනකම් මනිනවා
+#   python -m pytest test_request_metrics.py
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(metrics.RequestMetricsMiddleware)
+
+    @app.get("/stream")
+    async def stream():
+        async def tokens():
+            for i in range(3):
+                with metrics.span("node:agent"):
+                    await asyncio.sleep(0.05)
+                yield f"event: token\ndata: {i}\n\n"
+
+        return StreamingResponse(tokens(), media_type="text/event-stream")
+
+    return app
+
+
+def latency_sum(route: str):
+    labels = {"method": "GET", "route": route, "status": "200"}
+    return REGISTRY.get_sample_value("tourism_http_request_duration_seconds_sum", labels) or 0.0
+
+
+async def get(app, path: str, headers=None):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+def test_streamed_request_is_timed_until_the_last_chunk(monkeypatch, caplog):
+    monkeypatch.setattr(metrics, "TRACE_LOGS", True)
+    before = latency_sum("/stream")
+
+    with caplog.at_level(logging.INFO, logger="tourism_api.trace"):
+        response = asyncio.run(get(make_app(), "/stream", headers={"X-Request-ID": "abc123"}))
+
+    assert response.status_code == 200
+    assert response.text.count("event: token") == 3
+    assert response.headers["x-request-id"] == "abc123"
+    assert latency_sum("/stream") - before >= 0.15
+
+    trace = json.loads(caplog.records[-1].getMessage())
+    assert trace["request_id"] == "abc123"
+    assert trace["route"] == "/stream"
+    assert trace["ms"] >= 150
+    assert [span["name"] for span in trace["spans"]] == ["node:agent"] * 3
@@ -0,0 +1,97 @@
+import asyncio
+
+import httpx
+import pytest
+
+import agent
+import cache
+from cache import TTLCache
+
+# get_weather + weather_cache: fake OpenWeatherMap server එකක් (httpx.MockTransport) එක්ක
+#   python -m pytest test_weather_cache.py
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # TTL expiry test කරන්න cache එකේ time.time() එක අතින් ඉස්සරහට යවනවා
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def weather_api(monkeypatch, clock):
+    requests = []
+
+    def handler(request: httpx.Request):
+        city = request.url.params["q"]
+        requests.append(city)
+        if city == "Nowhere":
+            return httpx.Response(404, json={"message": "city not found"})
+        return httpx.Response(200, json={
+            "main": {"temp": 25, "humidity": 80},
+            "weather": [{"description": f"light rain over {city}"}],
+        })
+
+    monkeypatch.setattr(agent, "OPENWEATHER_URL", "http://openweather.test/data/2.5/weather")
+    monkeypatch.setattr(agent, "weather_cache", TTLCache(maxsize=2, ttl=600))
+    monkeypatch.setattr(agent, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    yield requests
+    asyncio.run(agent._http_client.aclose())
+
+
+def get_weather(city: str):
+    return asyncio.run(agent.get_weather.ainvoke({"city": city}))
+
+
+def test_repeat_lookup_is_served_from_cache(weather_api):
+    first = get_weather("Kandy")
+    second = get_weather("Kandy")
+
+    assert first == second
+    assert "light rain over Kandy" in first
+    assert weather_api == ["Kandy"]
+    assert agent.weather_cache.stats()["hits"] == 1
+    assert agent.weather_cache.stats()["misses"] == 1
+
+
+def test_city_keys_are_normalised(weather_api):
+    get_weather("Kandy")
+    get_weather("  kandy ")
+    get_weather("KANDY")
+
+    assert weather_api == ["Kandy"]
+    assert agent.weather_cache.stats()["hits"] == 2
+
+
+def test_entry_expires_after_ttl(weather_api, clock):
+    get_weather("Galle")
+    clock[0] += 599
+    get_weather("Galle")
+    assert weather_api == ["Galle"]
+
+    clock[0] += 2
+    get_weather("Galle")
+    assert weather_api == ["Galle", "Galle"]
+    assert agent.weather_cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_city_is_evicted(weather_api):
+    get_weather("Kandy")
+    get_weather("Galle")
+    get_weather("Kandy")  # Kandy දැන් අලුත්ම එක, ඊළඟට අයින් වෙන්නේ Galle
+    get_weather("Ella")
+
+    assert len(agent.weather_cache) == 2
+    get_weather("Kandy")
+    assert weather_api == ["Kandy", "Galle", "Ella"]
+    get_weather("Galle")
+    assert weather_api == ["Kandy", "Galle", "Ella", "Galle"]
+
+
+def test_failed_lookup_is_not_cached(weather_api):
+    assert get_weather("Nowhere") == "Weather data unavailable."
+    assert get_weather("Nowhere") == "Weather data unavailable."
+
+    assert weather_api == ["Nowhere", "Nowhere"]
+    assert len(agent.weather_cache) == 0
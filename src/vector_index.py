@@ -0,0 +1,101 @@
+import os
+import json
+from typing import Any, List
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+# Chroma එකට විකල්පයක්: embeddings memory-mapped .npy file එකක (float16 / int8).
+# Processes කිහිපයක් එකම file එක OS page cache එක හරහා share කරගන්නවා.
+INDEX_DIR = "./vector_index"
+SCORE_BLOCK_ROWS = 65536  # Query එකකට temporary float32 copy එක bounded කරන්න
+
+
+def export_index(vector_db, index_dir: str = INDEX_DIR, dtype: str = "float16"):
+    data = vector_db.get(include=["embeddings", "documents", "metadatas"])
+    vectors = np.asarray(data["embeddings"], dtype=np.float32)
+    if vectors.size == 0:
+        raise ValueError("Vector store is empty, nothing to export.")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+
+    os.makedirs(index_dir, exist_ok=True)
+    if dtype == "int8":
+        # Row එකකට scale එකක් (symmetric quantization)
+        scales = (np.abs(vectors).max(axis=1) / 127.0).clip(min=1e-12).astype(np.float32)
+        np.save(os.path.join(index_dir, "embeddings.npy"), np.round(vectors / scales[:, None]).astype(np.int8))
+        np.save(os.path.join(index_dir, "scales.npy"), scales)
+    elif dtype == "float16":
+        np.save(os.path.join(index_dir, "embeddings.npy"), vectors.astype(np.float16))
+    else:
+        raise ValueError(f"Unsupported index dtype: {dtype}")
+
+    # Chunk text + metadata: jsonl එකක්, byte offsets වලින් ඕන row එක විතරක් කියවන්න
+    offsets = [0]
+    with open(os.path.join(index_dir, "chunks.jsonl"), "wb") as f:
+        for chunk_id, text, metadata in zip(data["ids"], data["documents"], data["metadatas"]):
+            line = json.dumps({"id": chunk_id, "page_content": text, "metadata": metadata or {}}, ensure_ascii=False)
+            f.write(line.encode("utf-8") + b"\n")
+            offsets.append(f.tell())
+    np.save(os.path.join(index_dir, "offsets.npy"), np.asarray(offsets, dtype=np.int64))
+
+    with open(os.path.join(index_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"dtype": dtype, "count": len(vectors), "dim": vectors.shape[1]}, f)
+    return len(vectors)
+
+
+class MmapVectorIndex:
+    """Read-only top-k cosine search over an index written by export_index()."""
+
+    def __init__(self, index_dir: str = INDEX_DIR):
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.vectors = np.load(os.path.join(index_dir, "embeddings.npy"), mmap_mode="r")
+        self.scales = None
+        if self.meta["dtype"] == "int8":
+            self.scales = np.load(os.path.join(index_dir, "scales.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(index_dir, "offsets.npy"), mmap_mode="r")
+        self._chunks_fd = os.open(os.path.join(index_dir, "chunks.jsonl"), os.O_RDONLY)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def close(self):
+        os.close(self._chunks_fd)
+
+    def scores(self, query_vector):
+        query = np.asarray(query_vector, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        result = np.empty(len(self.vectors), dtype=np.float32)
+        for start in range(0, len(self.vectors), SCORE_BLOCK_ROWS):
+            end = start + SCORE_BLOCK_ROWS
+            block_scores = self.vectors[start:end].astype(np.float32) @ query
+            if self.scales is not None:
+                block_scores *= self.scales[start:end]
+            result[start:end] = block_scores
+        return result
+
+    def search(self, query_vector, k: int = 3):
+        scores = self.scores(query_vector)
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.document(int(i)), float(scores[i])) for i in top]
+
+    def document(self, i: int):
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        row = json.loads(os.pread(self._chunks_fd, end - start, start))
+        return Document(page_content=row["page_content"], metadata={**row["metadata"], "id": row["id"]})
+
+
+class MmapRetriever(BaseRetriever):
+    """LangChain retriever backed by a MmapVectorIndex."""
+
+    index: Any
+    embeddings: Any
+    k: int = 3
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        query_vector = self.embeddings.embed_query(query)
+        return [doc for doc, _ in self.index.search(query_vector, self.k)]